@@ -0,0 +1,185 @@
+"""Nodes and seconds per depth for the checkers AI against plain minimax on the GUI Board.
+
+    python3 bench.py [--depths 4 5 6 7 8] [--baseline-max 5]
+    python3 bench.py --movegen [--positions 200]    # move generation alone, old and new
+"""
+import os
+import sys
+import copy
+import time
+import random
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from checkers import Board, BitBoard, Piece, RED, WHITE, ROWS, COLS, minimax, new_stats
+
+# r/w = red/white man, R/W = king, row 0 at the top (white starts there)
+POSITIONS = {
+    'opening': [
+        ".w.w.w.w",
+        "w.w.w.w.",
+        ".w.w.w.w",
+        "........",
+        "........",
+        "r.r.r.r.",
+        ".r.r.r.r",
+        "r.r.r.r.",
+    ],
+    'midgame': [
+        ".w.w.w.w",
+        "w.w...w.",
+        ".w...w.w",
+        "..w.....",
+        ".r...r..",
+        "r...r.r.",
+        ".r.r...r",
+        "r.r.r...",
+    ],
+}
+
+def board_from_rows(rows):
+    board = Board()
+    board.board = [[0] * COLS for _ in range(ROWS)]
+    board.red_left = board.white_left = board.red_kings = board.white_kings = 0
+    for r, line in enumerate(rows):
+        for c, ch in enumerate(line):
+            if ch == '.': continue
+            piece = Piece(r, c, RED if ch in 'rR' else WHITE)
+            if ch.isupper(): piece.make_king()
+            board.board[r][c] = piece
+            if piece.color == RED: board.red_left += 1; board.red_kings += piece.king
+            else: board.white_left += 1; board.white_kings += piece.king
+    board.bits = BitBoard.from_board(board)
+    return board
+
+def deepcopy_children(board, color):
+    # How the AI used to expand a node: one deep copy of the GUI Board per move
+    boards = []
+    for piece in board.get_all_pieces(color):
+        for (row, col), skip in board.get_valid_moves(piece).items():
+            child = copy.deepcopy(board)
+            child.move(child.get_piece(piece.row, piece.col), row, col)
+            if skip: child.remove(skip)
+            boards.append(child)
+    return boards
+
+def plain_minimax(board, depth, max_player, stats):
+    # The search before alpha-beta: every node expands every move
+    stats['nodes'] += 1
+    if depth == 0 or board.winner() != None: return board.evaluate()
+    values = [plain_minimax(b, depth-1, not max_player, stats) for b in deepcopy_children(board, WHITE if max_player else RED)]
+    if not values: return board.evaluate()
+    return max(values) if max_player else min(values)
+
+def crowded_positions(count, seed=1):
+    # Boards 10-30 plies into seeded random games that still have at least 16 pieces
+    rng = random.Random(seed)
+    boards = [BitBoard.from_board(board_from_rows(POSITIONS['midgame']))]
+    while len(boards) < count:
+        board, color = BitBoard.from_board(Board()), RED
+        for _ in range(rng.randint(10, 30)):
+            moves = list(board.moves(color))
+            if not moves: break
+            board.apply(rng.choice(moves), color)
+            color = WHITE if color == RED else RED
+        if bin(board.red | board.white).count('1') >= 16: boards.append(board)
+    return boards
+
+# The GUI's move generation before it moved onto the engine's capture generator, kept as
+# the baseline: it recursed left/right hop by hop through a shared mutable default and
+# also offered the squares part-way through a multi-jump
+def traverse_moves(board, piece):
+    moves = {}
+    left, right, row = piece.col - 1, piece.col + 1, piece.row
+    if piece.color == RED or piece.king:
+        moves.update(_traverse_left(board, row -1, max(row-3, -1), -1, piece.color, left))
+        moves.update(_traverse_right(board, row -1, max(row-3, -1), -1, piece.color, right))
+    if piece.color == WHITE or piece.king:
+        moves.update(_traverse_left(board, row +1, min(row+3, ROWS), 1, piece.color, left))
+        moves.update(_traverse_right(board, row +1, min(row+3, ROWS), 1, piece.color, right))
+    return moves
+
+def _traverse_left(board, start, stop, step, color, left, skipped=[]):
+    moves = {}
+    last = []
+    for r in range(start, stop, step):
+        if left < 0: break
+        current = board.board[r][left]
+        if current == 0:
+            if skipped and not last: break
+            elif skipped: moves[(r, left)] = last + skipped
+            else: moves[(r, left)] = last
+            if last:
+                row = max(r-3, -1) if step == -1 else min(r+3, ROWS)
+                moves.update(_traverse_left(board, row, stop, step, color, left-1, skipped=last))
+                moves.update(_traverse_right(board, row, stop, step, color, left+1, skipped=last))
+            break
+        elif current.color == color: break
+        else: last = [current]
+        left -= 1
+    return moves
+
+def _traverse_right(board, start, stop, step, color, right, skipped=[]):
+    moves = {}
+    last = []
+    for r in range(start, stop, step):
+        if right >= COLS: break
+        current = board.board[r][right]
+        if current == 0:
+            if skipped and not last: break
+            elif skipped: moves[(r, right)] = last + skipped
+            else: moves[(r, right)] = last
+            if last:
+                row = max(r-3, -1) if step == -1 else min(r+3, ROWS)
+                moves.update(_traverse_left(board, row, stop, step, color, right-1, skipped=last))
+                moves.update(_traverse_right(board, row, stop, step, color, right+1, skipped=last))
+            break
+        elif current.color == color: break
+        else: last = [current]
+        right += 1
+    return moves
+
+def bench_movegen(count, rounds=5):
+    bitboards = crowded_positions(count)
+    boards = [b.to_board() for b in bitboards]
+    pieces = [p for board in boards for p in board.get_all_pieces(RED) + board.get_all_pieces(WHITE)]
+    runs = [
+        ('traverse (old GUI)', lambda: sum(len(traverse_moves(board, p)) for board in boards
+                                           for p in board.get_all_pieces(RED) + board.get_all_pieces(WHITE))),
+        ('Board.get_valid_moves', lambda: sum(len(board.get_valid_moves(p)) for board in boards
+                                              for p in board.get_all_pieces(RED) + board.get_all_pieces(WHITE))),
+        ('BitBoard.moves', lambda: sum(len(list(b.moves(RED))) + len(list(b.moves(WHITE))) for b in bitboards)),
+    ]
+    print(f"{len(boards)} positions, {len(pieces)} pieces, {rounds} rounds each")
+    print(f"{'generator':<24}{'moves':>8}{'seconds':>10}{'positions/s':>13}")
+    for label, run in runs:
+        start = time.perf_counter()
+        for _ in range(rounds): moves = run()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24}{moves:>8}{elapsed:>10.2f}{len(boards) * rounds / elapsed:>13.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depths', type=int, nargs='+', default=[4, 5, 6, 7, 8])
+    parser.add_argument('--baseline-max', type=int, default=5, help="deepest plain minimax run (it is slow)")
+    parser.add_argument('--movegen', action='store_true', help="time move generation instead of search")
+    parser.add_argument('--positions', type=int, default=200, help="crowded positions for --movegen")
+    args = parser.parse_args()
+    if args.movegen: return bench_movegen(args.positions)
+
+    print(f"{'position':<10}{'depth':>6}  {'search':<11}{'nodes':>10}{'seconds':>10}{'nodes/s':>10}")
+    for name, rows in POSITIONS.items():
+        for depth in args.depths:
+            runs = [('alpha-beta', lambda stats: minimax(BitBoard.from_board(board_from_rows(rows)), depth, True, None, stats=stats))]
+            if depth <= args.baseline_max:
+                runs.insert(0, ('minimax', lambda stats: plain_minimax(board_from_rows(rows), depth, True, stats)))
+            for label, run in runs:
+                stats = new_stats()
+                start = time.perf_counter()
+                run(stats)
+                elapsed = time.perf_counter() - start
+                print(f"{name:<10}{depth:>6}  {label:<11}{stats['nodes']:>10}{elapsed:>10.2f}{stats['nodes'] / elapsed:>10.0f}")
+                sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Generate the checkers endgame database by retrograde analysis.
+
+Every position with 2 to 4 pieces is solved under the game's own move
+rules (a side with no pieces or no moves has lost). Slices are solved
+smallest first, and within a piece count the ones with fewer men first,
+so every capture or crowning leads into a slice that is already known. Positions that neither
+side can force are draws.
+
+    python3 build_endgame.py [endgame.bin]
+
+The result is one byte per position, compressed slice by slice (see
+checkers.EndgameDB for the layout); rebuild it whenever the move rules or
+the indexing change. A full build takes a while, so --max-pieces 3 makes
+a quick, smaller database.
+"""
+import os
+import sys
+import time
+import zlib
+import argparse
+from array import array
+from itertools import combinations
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from checkers import (BitBoard, EndgameDB, RED, WHITE, CROWN_ROW, RED_MAN, WHITE_MAN, ENDGAME_FILE,
+                      ENDGAME_MAGIC, ENDGAME_SLICE, endgame_slice, endgame_index, slice_size)
+
+def slices(max_pieces):
+    # (red men, red kings, white men, white kings) in the order they must be solved
+    keys = []
+    for pieces in range(2, max_pieces + 1):
+        for red in range(1, pieces):
+            for rm in range(red + 1):
+                for wm in range(pieces - red + 1):
+                    keys.append((rm, red - rm, wm, pieces - red - wm))
+    return sorted(keys, key=lambda k: (sum(k), k[0] + k[2]))
+
+def positions(key):
+    # Every placement of the slice's pieces; men never stand on their own crowning row
+    rm, rk, wm, wk = key
+    def place(groups, occupied):
+        if not groups:
+            yield ()
+            return
+        count, forbidden = groups[0]
+        free = [sq for sq in range(32) if not (occupied | forbidden) >> sq & 1]
+        for squares in combinations(free, count):
+            bits = sum(1 << sq for sq in squares)
+            for rest in place(groups[1:], occupied | bits):
+                yield (bits,) + rest
+    groups = [(rm, CROWN_ROW[RED_MAN]), (rk, 0), (wm, CROWN_ROW[WHITE_MAN]), (wk, 0)]
+    for red_men, red_kings, white_men, white_kings in place(groups, 0):
+        yield BitBoard(red_men | red_kings, white_men | white_kings, red_kings | white_kings)
+
+def solve(key, db):
+    size = slice_size(key)
+    table = db.tables[key]
+    left = array('H', bytes(2 * size))       # Replies inside the slice not yet known to lose for us
+    loss_plies = array('H', bytes(2 * size)) # Longest loss so far, if every reply wins for the opponent
+    blocked = bytearray(size)                # A reply outside the slice already saves us from losing
+    parents, children = array('I'), array('I')
+    buckets = {}
+
+    for board in positions(key):
+        for white_to_move in (False, True):
+            color = WHITE if white_to_move else RED
+            index = endgame_index(board, white_to_move)
+            best_win = None
+            for move in board.moves(color):
+                saved = board.apply(move, color)
+                if endgame_slice(board) == key:
+                    parents.append(index)
+                    children.append(endgame_index(board, not white_to_move))
+                    left[index] += 1
+                else:
+                    result, plies = db.probe(board, not white_to_move)
+                    if result < 0: best_win = plies + 1 if best_win is None else min(best_win, plies + 1)
+                    elif result > 0: loss_plies[index] = max(loss_plies[index], plies + 1)
+                    else: blocked[index] = 1
+                board.undo(move, color, saved)
+            if best_win is not None:
+                blocked[index] = 1
+                buckets.setdefault(best_win, []).append((index, True))
+            elif not left[index] and not blocked[index]:
+                buckets.setdefault(loss_plies[index], []).append((index, False))
+
+    # Reverse edges, grouped by child
+    start = array('I', bytes(4 * (size + 1)))
+    for child in children: start[child + 1] += 1
+    for i in range(size): start[i + 1] += start[i]
+    fill = array('I', start)
+    preds = array('I', bytes(4 * len(children)))
+    for parent, child in zip(parents, children):
+        preds[fill[child]] = parent
+        fill[child] += 1
+    del parents, children, fill
+
+    # Settle positions in order of distance, so each gets its shortest win or longest loss
+    while buckets:
+        plies = min(buckets)
+        for index, win in buckets.pop(plies):
+            if table[index]: continue
+            if plies + 1 > 255: raise OverflowError(f"slice {key}: a result {plies} plies away does not fit in a byte")
+            table[index] = plies + 1
+            for i in range(start[index], start[index + 1]):
+                parent = preds[i]
+                if table[parent]: continue
+                if not win:
+                    buckets.setdefault(plies + 1, []).append((parent, True))
+                else:
+                    left[parent] -= 1
+                    loss_plies[parent] = max(loss_plies[parent], plies + 1)
+                    if not left[parent] and not blocked[parent]:
+                        buckets.setdefault(loss_plies[parent], []).append((parent, False))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', nargs='?', default=ENDGAME_FILE)
+    parser.add_argument('--max-pieces', type=int, default=4)
+    args = parser.parse_args()
+
+    keys = slices(args.max_pieces)
+    db = EndgameDB({key: bytearray(slice_size(key)) for key in keys})
+    for key in keys:
+        start = time.perf_counter()
+        solve(key, db)
+        table = db.tables[key]
+        wins = sum(1 for b in table if b and b % 2 == 0)
+        losses = sum(1 for b in table if b % 2 == 1)
+        print(f"{str(key):<14}{len(table):>9} positions  {wins:>8} wins {losses:>8} losses"
+              f"  longest {max(table) - 1:>3} plies  {time.perf_counter() - start:6.1f}s")
+        sys.stdout.flush()
+
+    packed = [zlib.compress(db.tables[key], 9) for key in keys]
+    with open(args.output, 'wb') as f:
+        f.write(ENDGAME_MAGIC)
+        f.write(len(keys).to_bytes(2, 'big'))
+        offset = 0
+        for key, data in zip(keys, packed):
+            f.write(ENDGAME_SLICE.pack(*key, offset, len(data)))
+            offset += len(data)
+        for data in packed: f.write(data)
+    print(f"wrote {sum(len(t) for t in db.tables.values())} positions in {offset} bytes to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 import pygame
+import os
 import sys
-import copy
+import time
+import random
+import struct
+import zlib
 
 # --- SETUP ---
 pygame.init()
@@ -18,6 +22,12 @@ BLUE = (0, 0, 255)
 GOLD = (255, 215, 0)    
 GREY = (128, 128, 128)
 
+# AI
+AI_TIME_LIMIT = 1.0   # Seconds of thinking per move
+AI_MAX_DEPTH = 12
+TT_MAX_ENTRIES = 1 << 20   # The transposition table is cleared when it grows past this
+ENDGAME_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endgame.bin")
+
 # --- PIXEL FONT ENGINE (5x7) ---
 PIXEL_FONT_5x7 = {
     'A': [0x70, 0x88, 0x88, 0xF8, 0x88, 0x88, 0x88],
@@ -96,6 +106,7 @@ class Board:
         self.red_left = self.white_left = 12
         self.red_kings = self.white_kings = 0
         self.create_board()
+        self.bits = BitBoard.from_board(self)   # The same position for the engine's move generator
 
     def create_board(self):
         for row in range(ROWS):
@@ -138,6 +149,7 @@ class Board:
         return pieces
 
     def move(self, piece, row, col):
+        self.bits.lift(rc_to_square(piece.row, piece.col))
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)
 
@@ -145,6 +157,7 @@ class Board:
             piece.make_king()
             if piece.color == WHITE: self.white_kings += 1
             else: self.red_kings += 1 
+        self.bits.put(rc_to_square(row, col), piece.color, piece.king)
 
     def get_piece(self, row, col):
         return self.board[row][col]
@@ -153,6 +166,7 @@ class Board:
         for piece in pieces:
             self.board[piece.row][piece.col] = 0
             if piece != 0:
+                self.bits.lift(rc_to_square(piece.row, piece.col))
                 if piece.color == RED: self.red_left -= 1
                 else: self.white_left -= 1
     
@@ -162,101 +176,424 @@ class Board:
         return None
 
     def get_valid_moves(self, piece):
+        # {(row, col): [captured pieces]} for one piece, from the generator the AI searches
+        # with: complete capture sequences only. A square is one click, so when several
+        # sequences end on it the one taking the most pieces is offered. A king whose
+        # captures bring it back round to its own square offers that square.
         moves = {}
-        left = piece.col - 1
-        right = piece.col + 1
-        row = piece.row
-
-        if piece.color == RED or piece.king:
-            moves.update(self._traverse_left(row -1, max(row-3, -1), -1, piece.color, left))
-            moves.update(self._traverse_right(row -1, max(row-3, -1), -1, piece.color, right))
-        if piece.color == WHITE or piece.king:
-            moves.update(self._traverse_left(row +1, min(row+3, ROWS), 1, piece.color, left))
-            moves.update(self._traverse_right(row +1, min(row+3, ROWS), 1, piece.color, right))
+        bit = 1 << rc_to_square(piece.row, piece.col)
+        for _, to, taken, _ in self.bits.moves(piece.color, bit):
+            landing = SQUARE_RC[to]
+            if landing in moves and len(moves[landing]) >= bin(taken).count('1'): continue
+            skipped = []
+            while taken:
+                low = taken & -taken
+                taken ^= low
+                row, col = SQUARE_RC[low.bit_length() - 1]
+                skipped.append(self.board[row][col])
+            moves[landing] = skipped
         return moves
 
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if left < 0: break
-            current = self.board[r][left]
-            if current == 0:
-                if skipped and not last: break
-                elif skipped: moves[(r, left)] = last + skipped
-                else: moves[(r, left)] = last
-                if last:
-                    if step == -1: row = max(r-3, -1)
-                    else: row = min(r+3, ROWS)
-                    moves.update(self._traverse_left(row, stop, step, color, left-1, skipped=last))
-                    moves.update(self._traverse_right(row, stop, step, color, left+1, skipped=last))
-                break
-            elif current.color == color: break
-            else: last = [current]
-            left -= 1
-        return moves
+# --- ENGINE BOARD (32-square bitboards) ---
+# The playable squares are numbered 0-31, four per row from the top: square = row * 4 + col // 2.
+# The AI searches on BitBoard; Pieces are only created when a result goes back to the GUI Board.
+def square_to_rc(sq):
+    row = sq // 4
+    return row, 2 * (sq % 4) + (1 if row % 2 == 0 else 0)
+
+def rc_to_square(row, col):
+    return row * 4 + col // 2
+
+SQUARE_RC = [square_to_rc(sq) for sq in range(32)]
+
+def _neighbours(sq, dirs, dist):
+    row, col = square_to_rc(sq)
+    out = []
+    for dr, dc in dirs:
+        path = [(row + dr * i, col + dc * i) for i in range(1, dist + 1)]
+        if all(0 <= r < ROWS and 0 <= c < COLS for r, c in path):
+            out.append(tuple(rc_to_square(r, c) for r, c in path))
+    return out
+
+# Move tables indexed [kind][square]; kind is RED_MAN, WHITE_MAN or KING
+RED_MAN, WHITE_MAN, KING = 0, 1, 2
+_DIRS = {RED_MAN: [(-1, -1), (-1, 1)], WHITE_MAN: [(1, -1), (1, 1)], KING: [(-1, -1), (-1, 1), (1, -1), (1, 1)]}
+STEP_TABLE = [[[path[0] for path in _neighbours(sq, _DIRS[kind], 1)] for sq in range(32)] for kind in range(3)]
+JUMP_TABLE = [[_neighbours(sq, _DIRS[kind], 2) for sq in range(32)] for kind in range(3)]
+CROWN_ROW = {RED_MAN: 0x0000000F, WHITE_MAN: 0xF0000000}   # Where each side's men become kings
+
+# Zobrist keys per [red man, red king, white man, white king][square]; fixed seed so
+# every run hashes a position the same way. White to move is folded in by the search.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_PIECES = [[_zobrist_rng.getrandbits(64) for sq in range(32)] for p in range(4)]
+ZOBRIST_WHITE = _zobrist_rng.getrandbits(64)
+
+class BitBoard:
+    __slots__ = ('red', 'white', 'kings', 'hash')
+
+    def __init__(self, red, white, kings):
+        self.red, self.white, self.kings = red, white, kings
+        self.hash = self.compute_hash()
+
+    def compute_hash(self):
+        h = 0
+        for p, bits in enumerate((self.red & ~self.kings, self.red & self.kings,
+                                  self.white & ~self.kings, self.white & self.kings)):
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                h ^= ZOBRIST_PIECES[p][bit.bit_length() - 1]
+        return h
+
+    def put(self, sq, color, king):
+        # Add a piece on an empty square; with lift(), how the GUI Board keeps its copy in step
+        bit = 1 << sq
+        if color == RED: self.red |= bit
+        else: self.white |= bit
+        if king: self.kings |= bit
+        self.hash ^= ZOBRIST_PIECES[(0 if color == RED else 2) + (1 if king else 0)][sq]
+
+    def lift(self, sq):
+        # Take the piece on sq off the board
+        bit = 1 << sq
+        self.hash ^= ZOBRIST_PIECES[(0 if self.red & bit else 2) + (1 if self.kings & bit else 0)][sq]
+        self.red &= ~bit
+        self.white &= ~bit
+        self.kings &= ~bit
+
+    @classmethod
+    def from_board(cls, board):
+        red = white = kings = 0
+        grid = board.board
+        for sq, (row, col) in enumerate(SQUARE_RC):
+            piece = grid[row][col]
+            if piece == 0: continue
+            bit = 1 << sq
+            if piece.color == RED: red |= bit
+            else: white |= bit
+            if piece.king: kings |= bit
+        return cls(red, white, kings)
+
+    def to_board(self):
+        board = Board()
+        board.board = [[0] * COLS for _ in range(ROWS)]
+        for sq in range(32):
+            bit = 1 << sq
+            if not (self.red | self.white) & bit: continue
+            row, col = square_to_rc(sq)
+            piece = Piece(row, col, RED if self.red & bit else WHITE)
+            if self.kings & bit: piece.make_king()
+            board.board[row][col] = piece
+        board.red_left, board.white_left = bin(self.red).count('1'), bin(self.white).count('1')
+        board.red_kings, board.white_kings = bin(self.red & self.kings).count('1'), bin(self.white & self.kings).count('1')
+        board.bits = BitBoard(self.red, self.white, self.kings)
+        return board
 
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if right >= COLS: break
-            current = self.board[r][right]
-            if current == 0:
-                if skipped and not last: break
-                elif skipped: moves[(r, right)] = last + skipped
-                else: moves[(r, right)] = last
-                if last:
-                    if step == -1: row = max(r-3, -1)
-                    else: row = min(r+3, ROWS)
-                    moves.update(self._traverse_left(row, stop, step, color, right-1, skipped=last))
-                    moves.update(self._traverse_right(row, stop, step, color, right+1, skipped=last))
-                break
-            elif current.color == color: break
-            else: last = [current]
-            right += 1
-        return moves
+    def evaluate(self):
+        # Same heuristic as Board.evaluate
+        red_kings, white_kings = bin(self.red & self.kings).count('1'), bin(self.white & self.kings).count('1')
+        return bin(self.white).count('1') - bin(self.red).count('1') + (white_kings * 0.5 - red_kings * 0.5)
+
+    def winner(self):
+        if not self.red: return "AI WINS"
+        elif not self.white: return "RED WINS"
+        return None
+
+    def moves(self, color, pieces=0xFFFFFFFF):
+        # Moves of `color` (only the pieces on the `pieces` bits) as (from, to, captured bits,
+        # crowns) descriptors, generated lazily: complete capture sequences first, most pieces
+        # taken first, then plain steps
+        own, opp = (self.red, self.white) if color == RED else (self.white, self.red)
+        own &= pieces
+        man = RED_MAN if color == RED else WHITE_MAN
+        empty = ~(self.red | self.white) & 0xFFFFFFFF
+        captures = []
+        bits = own
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            sq = bit.bit_length() - 1
+            kind = KING if self.kings & bit else man
+            for land, taken in self._jumps(sq, kind, opp, empty | bit):
+                captures.append((sq, land, taken, kind != KING and CROWN_ROW[kind] >> land & 1 == 1))
+        captures.sort(key=lambda m: bin(m[2]).count('1'), reverse=True)
+        yield from captures
+        bits = own
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            sq = bit.bit_length() - 1
+            kind = KING if self.kings & bit else man
+            for to in STEP_TABLE[kind][sq]:
+                if empty >> to & 1: yield (sq, to, 0, kind != KING and CROWN_ROW[kind] >> to & 1 == 1)
+
+    def _jumps(self, sq, kind, opp, empty):
+        # Every complete capture sequence from sq as (landing square, captured bits), each once.
+        # Depth-first over an explicit stack of partial sequences; one that cannot jump again
+        # is complete, and a man that reaches the crowning row stops there. A king can take
+        # the same pieces in either direction round a loop, hence the final dedup.
+        found = []
+        stack = [(sq, 0)]
+        while stack:
+            at, taken = stack.pop()
+            extended = False
+            for over, land in JUMP_TABLE[kind][at]:
+                over_bit = 1 << over
+                if opp & over_bit and not taken & over_bit and empty >> land & 1:
+                    extended = True
+                    if kind != KING and CROWN_ROW[kind] >> land & 1: found.append((land, taken | over_bit))
+                    else: stack.append((land, taken | over_bit))
+            if taken and not extended: found.append((at, taken))
+        return list(dict.fromkeys(found)) if len(found) > 1 else found
+
+    def apply(self, move, color):
+        # Plays a move in place; returns what undo() needs (the king bits and hash before it).
+        # A king may finish a capture on the square it started from, so frm == to is allowed.
+        frm, to, taken, crowns = move
+        frm_bit, to_bit = 1 << frm, 1 << to
+        saved = self.kings, self.hash
+        own, opp = (0, 2) if color == RED else (2, 0)
+        king = 1 if self.kings & frm_bit else 0
+        h = self.hash ^ ZOBRIST_PIECES[own + king][frm] ^ ZOBRIST_PIECES[own + (king or crowns)][to]
+        bits = taken
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            h ^= ZOBRIST_PIECES[opp + (1 if self.kings & bit else 0)][bit.bit_length() - 1]
+        if color == RED:
+            self.red = (self.red & ~frm_bit) | to_bit
+            self.white &= ~taken
+        else:
+            self.white = (self.white & ~frm_bit) | to_bit
+            self.red &= ~taken
+        kings = self.kings & ~taken
+        if king or crowns: kings = (kings & ~frm_bit) | to_bit
+        self.kings, self.hash = kings, h
+        return saved
+
+    def undo(self, move, color, saved):
+        frm, to, taken, _ = move
+        frm_bit, to_bit = 1 << frm, 1 << to
+        if color == RED:
+            self.red = (self.red & ~to_bit) | frm_bit
+            self.white |= taken
+        else:
+            self.white = (self.white & ~to_bit) | frm_bit
+            self.red |= taken
+        self.kings, self.hash = saved
+
+# endgame.bin is cut into slices by material (red men, red kings, white men, white kings),
+# each deflated with zlib on its own so EndgameDB only inflates the ones a game reaches. A
+# slice's bytes are indexed by endgame_index, the colex rank of each group of pieces on the
+# squares left free, times two for the side to move: 0 is a draw, otherwise 1 + the plies to
+# the end with best play, even for a win by the side to move. After "CKENDDB1" and the slice
+# count, the directory gives each slice's counts, offset and compressed length.
+ENDGAME_MAGIC = b"CKENDDB1"
+ENDGAME_SLICE = struct.Struct(">BBBBII")
+BINOMIAL = [[1 if k == 0 else 0 for k in range(33)] for n in range(33)]
+for _n in range(1, 33):
+    for _k in range(1, 33): BINOMIAL[_n][_k] = BINOMIAL[_n-1][_k-1] + BINOMIAL[_n-1][_k]
+
+def endgame_slice(board):
+    # Which slice a position belongs to: how many of each kind of piece it has
+    return (bin(board.red & ~board.kings).count('1'), bin(board.red & board.kings).count('1'),
+            bin(board.white & ~board.kings).count('1'), bin(board.white & board.kings).count('1'))
+
+def slice_size(key):
+    # Positions in a slice, both sides to move: the groups are placed one after the other,
+    # each on the squares the earlier groups left free
+    size, free = 2, 32
+    for count in key:
+        size *= BINOMIAL[free][count]
+        free -= count
+    return size
+
+def endgame_index(board, white_to_move):
+    # Colex rank of each group of pieces among the squares still free, mixed radix over groups
+    index, scale, occupied = 0, 1, 0
+    for bits in (board.red & ~board.kings, board.red & board.kings,
+                 board.white & ~board.kings, board.white & board.kings):
+        rank, i, rest = 0, 1, bits
+        while rest:
+            bit = rest & -rest
+            rest ^= bit
+            rank += BINOMIAL[bit.bit_length() - 1 - bin(occupied & (bit - 1)).count('1')][i]
+            i += 1
+        index += rank * scale
+        scale *= BINOMIAL[32 - bin(occupied).count('1')][i - 1]
+        occupied |= bits
+    return index * 2 + white_to_move
+
+class EndgameDB:
+    # Perfect-play results for every position with few pieces, keyed by slice. Tables loaded
+    # from a file stay compressed until the first probe that needs them.
+    def __init__(self, tables=None, packed=None):
+        self.tables = tables or {}
+        self.packed = packed or {}
+        self.max_pieces = max((sum(key) for key in list(self.tables) + list(self.packed)), default=0)
+
+    @classmethod
+    def load(cls, path=ENDGAME_FILE):
+        if not os.path.exists(path): return None
+        with open(path, 'rb') as f: data = f.read()
+        if data[:len(ENDGAME_MAGIC)] != ENDGAME_MAGIC: raise ValueError(f"{path} is not an endgame database")
+        count, = struct.unpack_from(">H", data, len(ENDGAME_MAGIC))
+        base = len(ENDGAME_MAGIC) + 2 + count * ENDGAME_SLICE.size
+        packed = {}
+        for i in range(count):
+            *key, offset, length = ENDGAME_SLICE.unpack_from(data, len(ENDGAME_MAGIC) + 2 + i * ENDGAME_SLICE.size)
+            packed[tuple(key)] = data[base + offset:base + offset + length]
+        return cls(packed=packed)
+
+    def probe(self, board, white_to_move):
+        # (result, plies) for the side to move, result 1 win / 0 draw / -1 loss; None if not stored
+        if bin(board.red | board.white).count('1') > self.max_pieces: return None
+        own, opp = (board.white, board.red) if white_to_move else (board.red, board.white)
+        if not own: return -1, 0
+        if not opp: return 1, 0
+        key = endgame_slice(board)
+        table = self.tables.get(key)
+        if table is None:
+            if key not in self.packed: return None
+            table = self.tables[key] = zlib.decompress(self.packed.pop(key))
+        byte = table[endgame_index(board, white_to_move)]
+        if not byte: return 0, 0
+        return (1 if byte % 2 == 0 else -1), byte - 1
+
+ENDGAME_DB = EndgameDB.load()
 
 # --- AI ALGORITHM (Minimax) ---
-def minimax(board, depth, max_player, game):
-    if depth == 0 or board.winner() != None:
-        return board.evaluate(), board
-    
+class SearchTimeout(Exception): pass
+
+WIN_SCORE = 1000   # A finished game; the endgame database scores a win in n plies as WIN_SCORE - n
+EXACT, LOWER, UPPER = 0, 1, 2   # Transposition table bounds
+
+def new_stats(time_limit=None):
+    # Shared by one search: nodes visited, optionally when to give up (seconds from now),
+    # the transposition table {key: (depth, value, bound, move)} and the endgame database
+    return {'nodes': 0, 'deadline': time.perf_counter() + time_limit if time_limit else None,
+            'tt': {}, 'endgame': ENDGAME_DB}
+
+def endgame_score(found, max_player):
+    # A database (result, plies) for the side to move, as a minimax value (white positive)
+    result, plies = found
+    score = result * (WIN_SCORE - plies)
+    return score if max_player else -score
+
+def _move_first(first, moves):
+    yield first
+    for move in moves:
+        if move != first: yield move
+
+def minimax(board, depth, max_player, game, alpha=float('-inf'), beta=float('inf'), stats=None):
+    tt = endgame = None
+    if stats is not None:
+        stats['nodes'] += 1
+        if stats['deadline'] and stats['nodes'] % 256 == 0 and time.perf_counter() > stats['deadline']:
+            raise SearchTimeout
+        tt, endgame = stats['tt'], stats['endgame']
+    if endgame:
+        found = endgame.probe(board, max_player)
+        if found: return endgame_score(found, max_player), None
+    winner = board.winner()
+    if winner != None:
+        return (WIN_SCORE if winner == "AI WINS" else -WIN_SCORE), None
+    if depth == 0:
+        return board.evaluate(), None
+
+    # The same position is reached through many move orders; reuse what an earlier visit proved
+    tt_move = None
+    if tt is not None:
+        key = board.hash ^ ZOBRIST_WHITE if max_player else board.hash
+        entry = tt.get(key)
+        if entry:
+            entry_depth, value, bound, tt_move = entry
+            if entry_depth >= depth and (bound == EXACT or (bound == LOWER and value >= beta)
+                                         or (bound == UPPER and value <= alpha)):
+                return value, tt_move
+    alpha_start, beta_start = alpha, beta
+    color = WHITE if max_player else RED
+    moves = get_all_moves(board, color, game)
+    if tt_move: moves = _move_first(tt_move, moves)
+
     if max_player: # White (AI)
         maxEval = float('-inf')
         best_move = None
-        for move in get_all_moves(board, WHITE, game):
-            evaluation = minimax(move, depth-1, False, game)[0]
-            maxEval = max(maxEval, evaluation)
-            if maxEval == evaluation:
+        for move in moves:
+            saved = board.apply(move, WHITE)
+            try: evaluation = minimax(board, depth-1, False, game, alpha, beta, stats)[0]
+            finally: board.undo(move, WHITE, saved)
+            if evaluation > maxEval or best_move is None:
+                maxEval = evaluation
                 best_move = move
-        return maxEval, best_move
+            alpha = max(alpha, maxEval)
+            if beta <= alpha: break
+        value = maxEval
     else: # Red (Human)
         minEval = float('inf')
         best_move = None
-        for move in get_all_moves(board, RED, game):
-            evaluation = minimax(move, depth-1, True, game)[0]
-            minEval = min(minEval, evaluation)
-            if minEval == evaluation:
+        for move in moves:
+            saved = board.apply(move, RED)
+            try: evaluation = minimax(board, depth-1, True, game, alpha, beta, stats)[0]
+            finally: board.undo(move, RED, saved)
+            if evaluation < minEval or best_move is None:
+                minEval = evaluation
                 best_move = move
-        return minEval, best_move
-
-def simulate_move(piece, move, board, game, skip):
-    board.move(piece, move[0], move[1])
-    if skip:
-        board.remove(skip)
-    return board
-
-def get_all_moves(board, color, game):
-    moves = []
-    for piece in board.get_all_pieces(color):
-        valid_moves = board.get_valid_moves(piece)
-        for move, skip in valid_moves.items():
-            temp_board = copy.deepcopy(board)
-            temp_piece = temp_board.get_piece(piece.row, piece.col)
-            new_board = simulate_move(temp_piece, move, temp_board, game, skip)
-            moves.append(new_board)
-    return moves
+            beta = min(beta, minEval)
+            if beta <= alpha: break
+        value = minEval
+
+    if tt is not None:
+        if len(tt) >= TT_MAX_ENTRIES: tt.clear()
+        bound = UPPER if value <= alpha_start else LOWER if value >= beta_start else EXACT
+        tt[key] = (depth, value, bound, best_move)
+    return value, best_move
+
+def endgame_move(board, endgame):
+    # White's best move read straight from the database: the quickest win, else a draw,
+    # else the longest loss. (value, move), or None if some reply is not stored.
+    best = None
+    for move in board.moves(WHITE):
+        saved = board.apply(move, WHITE)
+        found = endgame.probe(board, False)
+        board.undo(move, WHITE, saved)
+        if found is None: return None
+        value = endgame_score(found, False)
+        if best is None or value > best[0]: best = (value, move)
+    return best
+
+def iterative_deepening(board, game, time_limit=AI_TIME_LIMIT, max_depth=AI_MAX_DEPTH):
+    # Searches 1, 2, 3... plies deep, up to max_depth, answering with the deepest search
+    # that finished before time_limit; the clock only starts after the one-ply search, so
+    # there is always a move. Endings in the database skip the search and play its move.
+    # Searches one BitBoard in place (apply/undo) and only converts the chosen move back
+    # to a GUI Board at the end (None if there is no move).
+    board = BitBoard.from_board(board)
+    stats = new_stats()
+    found = None
+    if stats['endgame'] and stats['endgame'].probe(board, True):
+        found = endgame_move(board, stats['endgame'])
+    if found:
+        value, best = found
+        stats['depth'] = 0
+    else:
+        value, best = minimax(board, 1, True, game, stats=stats)
+        stats['depth'] = 1
+        stats['deadline'] = time.perf_counter() + time_limit
+        for depth in range(2, max_depth + 1):
+            try:
+                value, best = minimax(board, depth, True, game, stats=stats)
+            except SearchTimeout:
+                break
+            stats['depth'] = depth
+    if best is None: return value, None, stats
+    board.apply(best, WHITE)
+    return value, board.to_board(), stats
+
+def get_all_moves(board, color, game=None):
+    # Lazy (from, to, captured bits, crowns) descriptors for a BitBoard; nothing is copied,
+    # the search plays each one with board.apply() and takes it back with board.undo()
+    return board.moves(color)
 
 # --- MAIN GAME CONTROLLER ---
 class Game:
@@ -300,7 +637,8 @@ class Game:
 
     def _move(self, row, col):
         piece = self.board.get_piece(row, col)
-        if self.selected and piece == 0 and (row, col) in self.valid_moves:
+        # The selected piece's own square is a target when a king's captures lead back to it
+        if self.selected and (piece == 0 or piece is self.selected) and (row, col) in self.valid_moves:
             self.board.move(self.selected, row, col)
             skipped = self.valid_moves[(row, col)]
             if skipped:
@@ -349,7 +687,7 @@ def main():
         if game.turn == WHITE:
             # Simple AI Delay
             pygame.time.wait(100) 
-            value, new_board = minimax(game.get_board(), 3, True, game)
+            value, new_board, stats = iterative_deepening(game.get_board(), game)
             if new_board: # Make sure AI has a move
                 game.ai_move(new_board)
             else:
@@ -0,0 +1,106 @@
+"""Search chess positions from a FEN/EPD or PGN file and print one JSON line per position.
+
+    python3 analyze.py positions.fen --depth 4
+    python3 analyze.py games.pgn [--every-move] --movetime 2000 --jobs 4 > results.jsonl
+
+Fields: id, fen, move, score (centipawns, white's view), mate, depth, nodes, nps, time_ms.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from chess import Board, AI, MATE, START_FEN, move_to_uci, parse_san
+
+# Placement, side to move, castling rights and en passant square
+FEN_FIELDS = re.compile(r"(?:[pnbrqkPNBRQK1-8]+/){7}[pnbrqkPNBRQK1-8]+ [wb] (?:-|K?Q?k?q?) (?:-|[a-h][36])$")
+
+def fen_problem(fields):
+    # What is wrong with the first four fields of a FEN or EPD line, or None
+    if len(fields) < 4: return f"{len(fields)} field{'s' if len(fields) != 1 else ''}, expected at least 4"
+    if not FEN_FIELDS.match(' '.join(fields[:4])): return f"not a FEN position: {' '.join(fields[:4])}"
+    if any(sum(int(ch) if ch.isdigit() else 1 for ch in rank) != 8 for rank in fields[0].split('/')):
+        return f"ranks must be 8 squares wide: {fields[0]}"
+    return None
+
+def read_fens(path):
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.split('#')[0].strip()
+            if not line: continue
+            fields = line.split()
+            ident = f"{os.path.basename(path)}:{lineno}"
+            problem = fen_problem(fields)
+            if problem:
+                print(f"{ident}: {problem}, skipping it", file=sys.stderr)
+                continue
+            # EPD lines carry opcodes instead of the move counters
+            yield ident, ' '.join(fields[:4] + ['0', '1'])
+
+def _movetext_tokens(text):
+    text = re.sub(r"\{[^}]*\}|;[^\n]*", " ", text)
+    while re.search(r"\([^()]*\)", text): text = re.sub(r"\([^()]*\)", " ", text)
+    text = re.sub(r"\$\d+|\d+\.(\.\.)?|1-0|0-1|1/2-1/2|\*", " ", text)
+    return text.split()
+
+def read_pgn(path, every_move=False):
+    with open(path) as f: content = f.read()
+    # A game is its tag pairs followed by movetext; a new tag section starts the next game
+    games = re.findall(r"((?:^\[[^\n]*\]\s*\n)+)(.*?)(?=^\[|\Z)", content, re.M | re.S)
+    for number, (tags, movetext) in enumerate(games, 1):
+        headers = dict(re.findall(r'^\[(\w+)\s+"(.*)"\]', tags, re.M))
+        board = Board()
+        board.set_fen(headers.get('FEN', START_FEN))
+        ident = f"{os.path.basename(path)}#{number}"
+        try:
+            for ply, san in enumerate(_movetext_tokens(movetext), 1):
+                if every_move: yield f"{ident}:{ply - 1}", board.get_fen()
+                (r1, c1), (r2, c2) = parse_san(board, san)
+                board.make_move(r1, c1, r2, c2)
+        except ValueError as e:
+            print(f"{ident}: {e}, skipping the rest of the game", file=sys.stderr)
+            continue
+        yield ident, board.get_fen()
+
+_pool_ai = None
+
+def analyse(task):
+    # Runs in a worker process, which keeps one AI (and its table) for every position it is given
+    global _pool_ai
+    if _pool_ai is None: _pool_ai = AI()
+    ident, fen, depth, movetime = task
+    board = Board()
+    board.set_fen(fen)
+    start = time.perf_counter()
+    move = _pool_ai.get_best_move(board, depth=depth, time_limit=movetime)
+    elapsed = time.perf_counter() - start
+    ai = _pool_ai
+    return {'id': ident, 'fen': fen, 'move': move_to_uci(move) if move else None, 'score': ai.score,
+            'mate': abs(ai.score) >= MATE, 'depth': ai.depth_reached, 'nodes': ai.nodes,
+            'nps': int(ai.nodes / elapsed) if elapsed else 0, 'time_ms': int(elapsed * 1000)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('file', help="a .pgn file, or a file of FEN/EPD lines")
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument('--depth', type=int, default=4, help="fixed search depth (default 4)")
+    limit.add_argument('--movetime', type=int, help="milliseconds per position instead of a fixed depth")
+    parser.add_argument('--jobs', type=int, default=multiprocessing.cpu_count(), help="worker processes")
+    parser.add_argument('--every-move', action='store_true', help="PGN: analyse every position, not just the last")
+    args = parser.parse_args()
+
+    if args.file.lower().endswith('.pgn'): positions = read_pgn(args.file, args.every_move)
+    else: positions = read_fens(args.file)
+    tasks = ((ident, fen, args.depth, args.movetime) for ident, fen in positions)
+    with ProcessPoolExecutor(args.jobs) as pool:
+        for result in pool.map(analyse, tasks):
+            print(json.dumps(result))
+            sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""Nodes, seconds, TT hits and cutoffs of the chess search against the deep-copying original.
+
+    python3 bench.py [--depths 2 3 4] [--baseline-max 3] [--skip-baseline]
+    python3 bench.py --workers 1 2 4 0 --depths 4    # root-split search; 0 = one per CPU
+"""
+import os
+import sys
+import copy
+import time
+import argparse
+import multiprocessing
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from chess import (Board, AI, parse_uci, move_to_uci, EMPTY, W_PAWN, W_KNIGHT, W_BISHOP, W_ROOK, W_QUEEN,
+                   W_KING, B_PAWN, B_KNIGHT, B_BISHOP, B_ROOK, B_QUEEN, B_KING)
+
+# Black to move in both positions, since the AI plays black
+POSITIONS = {
+    'opening': "e2e4",
+    'middlegame': "e2e4 e7e5 g1f3 b8c6 f1c4 f8c5 c2c3 g8f6 d2d3 d7d6 e1g1 e8g8 b1d2 a7a6 a2a4 c8e6 c4e6 f7e6 d1b3",
+}
+
+def setup(moves, board_class=Board):
+    board = board_class()
+    for text in moves.split():
+        (r1, c1), (r2, c2) = parse_uci(text)
+        if not board.make_move(r1, c1, r2, c2): raise ValueError(f"illegal move {text}")
+    return board
+
+class OriginalBoard:
+    # The Board before push()/pop(), incremental hashing and the fast check test, as the
+    # deep-copy search ran on it: every legality test plays the move on a copy of the grid
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.board = [
+            [B_ROOK, B_KNIGHT, B_BISHOP, B_QUEEN, B_KING, B_BISHOP, B_KNIGHT, B_ROOK],
+            [B_PAWN] * 8,
+            [EMPTY] * 8,
+            [EMPTY] * 8,
+            [EMPTY] * 8,
+            [EMPTY] * 8,
+            [W_PAWN] * 8,
+            [W_ROOK, W_KNIGHT, W_BISHOP, W_QUEEN, W_KING, W_BISHOP, W_KNIGHT, W_ROOK]
+        ]
+        self.turn = 'white'
+        self.castling_rights = [True, True, True, True]
+        self.en_passant_target = None
+        self.winner = None
+        self.history = []
+
+    def save_state(self):
+        state = ([row[:] for row in self.board], self.turn, self.castling_rights[:], self.en_passant_target, self.winner)
+        self.history.append(state)
+
+    def get_piece(self, r, c):
+        if 0 <= r < 8 and 0 <= c < 8: return self.board[r][c]
+        return None
+
+    def is_white(self, piece): return 1 <= piece <= 6
+    def is_black(self, piece): return 7 <= piece <= 12
+
+    def get_valid_moves(self, piece, r, c, check_check=True):
+        moves = []
+        is_w = self.is_white(piece)
+
+        def add(nr, nc):
+            target = self.get_piece(nr, nc)
+            if target is None: return False
+            is_capture = False
+            if target != EMPTY:
+                if is_w and self.is_white(target): return False
+                if not is_w and self.is_black(target): return False
+                is_capture = True
+
+            if check_check:
+                if self.simulate_move(r, c, nr, nc): moves.append((nr, nc))
+            else:
+                moves.append((nr, nc))
+            return not is_capture
+
+        if piece in (W_PAWN, B_PAWN):
+            d = -1 if is_w else 1
+            start = 6 if is_w else 1
+            if self.get_piece(r+d, c) == EMPTY:
+                if not check_check or self.simulate_move(r, c, r+d, c): moves.append((r+d, c))
+                if r == start and self.get_piece(r+d*2, c) == EMPTY:
+                    if not check_check or self.simulate_move(r, c, r+d*2, c): moves.append((r+d*2, c))
+            for dc in [-1, 1]:
+                t = self.get_piece(r+d, c+dc)
+                if t and t != EMPTY and ((is_w and self.is_black(t)) or (not is_w and self.is_white(t))):
+                    if not check_check or self.simulate_move(r, c, r+d, c+dc): moves.append((r+d, c+dc))
+                if self.en_passant_target == (r+d, c+dc):
+                    if not check_check or self.simulate_move(r, c, r+d, c+dc): moves.append((r+d, c+dc))
+
+        elif piece in (W_KNIGHT, B_KNIGHT):
+            for dr, dc in [(2,1), (2,-1), (-2,1), (-2,-1), (1,2), (1,-2), (-1,2), (-1,-2)]: add(r+dr, c+dc)
+
+        elif piece in (W_BISHOP, B_BISHOP, W_ROOK, B_ROOK, W_QUEEN, B_QUEEN):
+            dirs = []
+            if piece not in (W_ROOK, B_ROOK): dirs.extend([(1,1), (1,-1), (-1,1), (-1,-1)])
+            if piece not in (W_BISHOP, B_BISHOP): dirs.extend([(1,0), (-1,0), (0,1), (0,-1)])
+            for dr, dc in dirs:
+                for i in range(1, 8):
+                    if not add(r+dr*i, c+dc*i): break
+
+        elif piece in (W_KING, B_KING):
+            for dr in [-1, 0, 1]:
+                for dc in [-1, 0, 1]:
+                    if dr==0 and dc==0: continue
+                    add(r+dr, c+dc)
+            if check_check and not self.is_in_check(is_w):
+                row = 7 if is_w else 0
+                idx = 0 if is_w else 2
+                if self.castling_rights[idx] and self.get_piece(row, 5)==EMPTY and self.get_piece(row, 6)==EMPTY:
+                    moves.append((row, 6))
+                if self.castling_rights[idx+1] and self.get_piece(row, 1)==EMPTY and self.get_piece(row, 2)==EMPTY and self.get_piece(row, 3)==EMPTY:
+                    moves.append((row, 2))
+        return moves
+
+    def find_king(self, is_white):
+        t = W_KING if is_white else B_KING
+        for r in range(8):
+            for c in range(8):
+                if self.board[r][c] == t: return r, c
+        return None
+
+    def is_in_check(self, is_white):
+        kp = self.find_king(is_white)
+        if not kp: return True
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                if p != EMPTY and ((is_white and self.is_black(p)) or (not is_white and self.is_white(p))):
+                    if kp in self.get_valid_moves(p, r, c, False): return True
+        return False
+
+    def simulate_move(self, r1, c1, r2, c2):
+        save_board = [row[:] for row in self.board]
+        save_ep = self.en_passant_target
+        self.move_piece_internal(r1, c1, r2, c2)
+        safe = not self.is_in_check(self.is_white(save_board[r1][c1]))
+        self.board = save_board
+        self.en_passant_target = save_ep
+        return safe
+
+    def move_piece_internal(self, r1, c1, r2, c2):
+        p = self.board[r1][c1]
+        self.board[r2][c2] = p
+        self.board[r1][c1] = EMPTY
+        if (p in (W_PAWN, B_PAWN)) and (r2, c2) == self.en_passant_target: self.board[r1][c2] = EMPTY
+        self.en_passant_target = None
+        if (p in (W_PAWN, B_PAWN)) and abs(r2-r1) == 2: self.en_passant_target = ((r1+r2)//2, c1)
+        if p == W_PAWN and r2 == 0: self.board[r2][c2] = W_QUEEN
+        if p == B_PAWN and r2 == 7: self.board[r2][c2] = B_QUEEN
+        if p == W_KING:
+            self.castling_rights[0] = self.castling_rights[1] = False
+            if c2-c1 == 2: self.board[7][5], self.board[7][7] = self.board[7][7], EMPTY
+            elif c2-c1 == -2: self.board[7][3], self.board[7][0] = self.board[7][0], EMPTY
+        if p == B_KING:
+            self.castling_rights[2] = self.castling_rights[3] = False
+            if c2-c1 == 2: self.board[0][5], self.board[0][7] = self.board[0][7], EMPTY
+            elif c2-c1 == -2: self.board[0][3], self.board[0][0] = self.board[0][0], EMPTY
+        if p == W_ROOK:
+            if r1==7 and c1==0: self.castling_rights[1] = False
+            if r1==7 and c1==7: self.castling_rights[0] = False
+        if p == B_ROOK:
+            if r1==0 and c1==0: self.castling_rights[3] = False
+            if r1==0 and c1==7: self.castling_rights[2] = False
+
+    def make_move(self, r1, c1, r2, c2):
+        if self.simulate_move(r1, c1, r2, c2):
+            self.save_state()
+            self.move_piece_internal(r1, c1, r2, c2)
+            self.turn = 'black' if self.turn == 'white' else 'white'
+            has_moves = False
+            is_w = (self.turn == 'white')
+            for r in range(8):
+                for c in range(8):
+                    p = self.board[r][c]
+                    if p!=EMPTY and ((is_w and self.is_white(p)) or (not is_w and self.is_black(p))):
+                        if self.get_valid_moves(p, r, c): has_moves = True; break
+            if not has_moves:
+                self.winner = 'black' if self.is_in_check(is_w) else 'draw' if is_w else 'white'
+                if not is_w and not self.is_in_check(False): self.winner = 'draw'
+            return True
+        return False
+
+    def get_all_moves(self, is_white):
+        moves = []
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                if p!=EMPTY and ((is_white and self.is_white(p)) or (not is_white and self.is_black(p))):
+                    for m in self.get_valid_moves(p, r, c): moves.append(((r,c), m))
+        return moves
+
+# --- AI ---
+
+class DeepcopyAI:
+    # The search as it was before Board.push()/pop(): one deep copy of an OriginalBoard per
+    # child, scored by material alone
+    def __init__(self):
+        self.nodes = 0
+        self.values = {EMPTY:0, W_PAWN:10, W_KNIGHT:30, W_BISHOP:30, W_ROOK:50, W_QUEEN:90, W_KING:900,
+                       B_PAWN:-10, B_KNIGHT:-30, B_BISHOP:-30, B_ROOK:-50, B_QUEEN:-90, B_KING:-900}
+
+    def evaluate(self, board): return sum(self.values.get(c, 0) for row in board.board for c in row)
+
+    def get_best_move(self, board, depth=2):
+        self.nodes = 0
+        moves = board.get_all_moves(False)
+        if not moves: return None
+        best, best_move = 99999, moves[0]
+        for s, e in moves:
+            tmp = copy.deepcopy(board)
+            tmp.make_move(s[0], s[1], e[0], e[1])
+            val = self.minimax(tmp, depth-1, -10000, 10000, True)
+            if val < best: best, best_move = val, (s, e)
+        return best_move
+
+    def minimax(self, board, depth, alpha, beta, is_max):
+        self.nodes += 1
+        if depth == 0 or board.winner: return self.evaluate(board)
+        moves = board.get_all_moves(is_max)
+        if not moves: return self.evaluate(board)
+        val = -99999 if is_max else 99999
+        for s, e in moves:
+            tmp = copy.deepcopy(board)
+            tmp.make_move(s[0], s[1], e[0], e[1])
+            child = self.minimax(tmp, depth-1, alpha, beta, not is_max)
+            if is_max: val = max(val, child); alpha = max(alpha, val)
+            else: val = min(val, child); beta = min(beta, val)
+            if beta <= alpha: break
+        return val
+
+def run(ai, board, depth):
+    start = time.perf_counter()
+    ai.get_best_move(board, depth)
+    elapsed = time.perf_counter() - start
+    return ai.nodes, elapsed
+
+def compare_workers(counts, depths):
+    # Same positions and depths, root moves split across 1, 2, 4... processes
+    counts = [n or multiprocessing.cpu_count() for n in counts]
+    print(f"{'position':<12}{'depth':>6}{'workers':>8}{'nodes':>10}{'seconds':>10}{'nodes/s':>10}{'speedup':>9}  move")
+    for name, moves in POSITIONS.items():
+        for depth in depths:
+            serial = None
+            for n in counts:
+                ai = AI(workers=n)
+                if n > 1: ai.get_best_move(setup(moves), 1)   # Start the pool outside the timing
+                start = time.perf_counter()
+                move = ai.get_best_move(setup(moves), depth)
+                elapsed = time.perf_counter() - start
+                ai.close()
+                serial = serial or elapsed
+                print(f"{name:<12}{depth:>6}{n:>8}{ai.nodes:>10}{elapsed:>10.2f}{ai.nodes / elapsed:>10.0f}"
+                      f"{serial / elapsed:>8.2f}x  {move_to_uci(move)}")
+                sys.stdout.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depths', type=int, nargs='+', default=[2, 3, 4])
+    parser.add_argument('--baseline-max', type=int, default=3, help="deepest deep-copy search run (it is slow)")
+    parser.add_argument('--skip-baseline', action='store_true', help="only time the push/pop search")
+    parser.add_argument('--workers', type=int, nargs='+', help="compare the parallel search at these worker counts")
+    args = parser.parse_args()
+    if args.workers: return compare_workers(args.workers, args.depths)
+
+    engines = [('push/pop', AI())]
+    if not args.skip_baseline: engines.insert(0, ('deepcopy', DeepcopyAI()))
+
+    print(f"{'position':<12}{'depth':>6}  {'search':<10}{'nodes':>10}{'seconds':>10}{'nodes/s':>10}"
+          f"{'qnodes':>9}{'cut%':>7}{'1st%':>7}{'tt hits':>10}{'misses':>10}{'collide':>10}")
+    for name, moves in POSITIONS.items():
+        for depth in args.depths:
+            for label, ai in engines:
+                if isinstance(ai, DeepcopyAI):
+                    if depth > args.baseline_max: continue
+                    nodes, elapsed = run(ai, setup(moves, OriginalBoard), depth)
+                    counters = f"{'-':>9}{'-':>7}{'-':>7}{'-':>10}{'-':>10}{'-':>10}"
+                else:
+                    nodes, elapsed = run(ai, setup(moves), depth)
+                    tt, st = ai.tt.stats(), ai.stats()
+                    counters = (f"{st['qnodes']:>9}{st['cutoff_rate']:>7.0%}{st['first_move_rate']:>7.0%}"
+                                f"{tt['hits']:>10}{tt['misses']:>10}{tt['collisions']:>10}")
+                print(f"{name:<12}{depth:>6}  {label:<10}{nodes:>10}{elapsed:>10.2f}{nodes / elapsed:>10.0f}{counters}")
+                sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
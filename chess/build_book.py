@@ -0,0 +1,52 @@
+"""Compile the chess opening book from a plain-text list of lines.
+
+Each non-empty line of the source is one opening line in coordinate
+notation, e.g. "e2e4 e7e5 g1f3 b8c6"; text after '#' is ignored. Every
+position along every line gets its next move, weighted by how many lines
+play it, and the records are written sorted by position hash so the game
+can memory-map and binary-search the result (see chess.OpeningBook).
+
+    python3 build_book.py [book.txt] [book.bin]
+
+Rebuild the book whenever the Zobrist keys in chess.py change.
+"""
+import os
+import sys
+import argparse
+from collections import Counter
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from chess import Board, BOOK_FILE, BOOK_MAGIC, BOOK_RECORD, encode_move, parse_uci
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def compile_lines(lines):
+    counts = Counter()
+    for lineno, text in enumerate(lines, 1):
+        text = text.split('#')[0].strip()
+        if not text: continue
+        board = Board()
+        for uci in text.split():
+            move = parse_uci(uci)
+            if move not in board.get_all_moves(board.turn == 'white'):
+                raise ValueError(f"line {lineno}: illegal move {uci}")
+            counts[(board.hash, encode_move(move))] += 1
+            board.make_move(move[0][0], move[0][1], move[1][0], move[1][1])
+    return sorted((key, code, min(weight, 0xFFFF)) for (key, code), weight in counts.items())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', nargs='?', default=os.path.join(HERE, "book.txt"))
+    parser.add_argument('output', nargs='?', default=BOOK_FILE)
+    args = parser.parse_args()
+
+    with open(args.source) as f:
+        try: records = compile_lines(f)
+        except ValueError as e: sys.exit(f"{args.source}: {e}")
+    with open(args.output, 'wb') as f:
+        f.write(BOOK_MAGIC)
+        for record in records: f.write(BOOK_RECORD.pack(*record))
+    print(f"{args.output}: {len(records)} positions/moves")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 import pygame
+import os
 import sys
-import copy
+import mmap
+import struct
 import random
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
 
 # --- CONFIGURATION ---
 WIDTH, HEIGHT = 800, 800
@@ -22,6 +28,13 @@ CHECK_RED = (255, 80, 80)
 OVERLAY_BG = (0, 0, 0, 180)    
 TEXT_COL = (255, 255, 255)
 
+# AI
+AI_TIME_LIMIT = 1500   # Milliseconds of thinking per move
+MAX_SEARCH_DEPTH = 32
+AI_WORKERS = 1         # Processes splitting the root moves; more than 1 enables the parallel search
+POOL_POLL = 0.05       # Seconds between checks for a cancel while waiting on the worker processes
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
 # PIECE CONSTANTS
 EMPTY = 0
 W_PAWN = 1; W_KNIGHT = 2; W_BISHOP = 3; W_ROOK = 4; W_QUEEN = 5; W_KING = 6
@@ -89,6 +102,78 @@ def draw_text(surface, text, x, y, scale=2, color=TEXT_COL, center=False):
         cursor_x += 6 * scale
 
 # --- CHESS LOGIC ---
+# Squares are (row, col) with row 0 = rank 8; moves are ((r1, c1), (r2, c2))
+def square_name(r, c): return chr(97 + c) + str(8 - r)
+def parse_square(name): return 8 - int(name[1]), ord(name[0]) - 97
+def move_to_uci(move): return square_name(*move[0]) + square_name(*move[1])
+def parse_uci(text): return parse_square(text[0:2]), parse_square(text[2:4])
+
+FEN_PIECES = {'P': W_PAWN, 'N': W_KNIGHT, 'B': W_BISHOP, 'R': W_ROOK, 'Q': W_QUEEN, 'K': W_KING,
+              'p': B_PAWN, 'n': B_KNIGHT, 'b': B_BISHOP, 'r': B_ROOK, 'q': B_QUEEN, 'k': B_KING}
+FEN_LETTERS = {v: k for k, v in FEN_PIECES.items()}
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+SAN_PIECES = {'N': W_KNIGHT, 'B': W_BISHOP, 'R': W_ROOK, 'Q': W_QUEEN, 'K': W_KING}
+# Castling right lost when anything moves from or to that rook's corner: K, Q, k, q
+CORNER_RIGHTS = {(7, 7): 0, (7, 0): 1, (0, 7): 2, (0, 0): 3}
+
+# Attack tables, precomputed per square so check detection can radiate out from the king
+def _on_board(r, c): return 0 <= r < 8 and 0 <= c < 8
+KNIGHT_TARGETS = [[[(r+dr, c+dc) for dr, dc in [(2,1), (2,-1), (-2,1), (-2,-1), (1,2), (1,-2), (-1,2), (-1,-2)] if _on_board(r+dr, c+dc)]
+                   for c in range(8)] for r in range(8)]
+KING_TARGETS = [[[(r+dr, c+dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr or dc) and _on_board(r+dr, c+dc)]
+                 for c in range(8)] for r in range(8)]
+def _rays(r, c, dirs):
+    rays = []
+    for dr, dc in dirs:
+        ray = [(r+dr*i, c+dc*i) for i in range(1, 8) if _on_board(r+dr*i, c+dc*i)]
+        if ray: rays.append(ray)
+    return rays
+DIAGONAL_RAYS = [[_rays(r, c, [(1,1), (1,-1), (-1,1), (-1,-1)]) for c in range(8)] for r in range(8)]
+STRAIGHT_RAYS = [[_rays(r, c, [(1,0), (-1,0), (0,1), (0,-1)]) for c in range(8)] for r in range(8)]
+
+# Zobrist keys: fixed seed so a position hashes the same in every process and every run
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_PIECES = [[[0 if p == EMPTY else _zobrist_rng.getrandbits(64) for c in range(8)] for r in range(8)] for p in range(13)]
+ZOBRIST_BLACK = _zobrist_rng.getrandbits(64)
+ZOBRIST_CASTLING = [_zobrist_rng.getrandbits(64) for _ in range(4)]
+ZOBRIST_EP = [_zobrist_rng.getrandbits(64) for _ in range(8)]
+
+# Evaluation in centipawns, white positive. Piece-square tables are from white's side with
+# row 0 = rank 8; black reads them mirrored. The board keeps running middlegame/endgame sums.
+PIECE_VALUES = [0, 100, 320, 330, 500, 900, 0]
+PST_MIDGAME = [None,
+    [[0, 0, 0, 0, 0, 0, 0, 0], [50, 50, 50, 50, 50, 50, 50, 50], [10, 10, 20, 30, 30, 20, 10, 10], [5, 5, 10, 25, 25, 10, 5, 5],
+     [0, 0, 0, 20, 20, 0, 0, 0], [5, -5, -10, 0, 0, -10, -5, 5], [5, 10, 10, -20, -20, 10, 10, 5], [0, 0, 0, 0, 0, 0, 0, 0]],
+    [[-50, -40, -30, -30, -30, -30, -40, -50], [-40, -20, 0, 0, 0, 0, -20, -40], [-30, 0, 10, 15, 15, 10, 0, -30], [-30, 5, 15, 20, 20, 15, 5, -30],
+     [-30, 0, 15, 20, 20, 15, 0, -30], [-30, 5, 10, 15, 15, 10, 5, -30], [-40, -20, 0, 5, 5, 0, -20, -40], [-50, -40, -30, -30, -30, -30, -40, -50]],
+    [[-20, -10, -10, -10, -10, -10, -10, -20], [-10, 0, 0, 0, 0, 0, 0, -10], [-10, 0, 5, 10, 10, 5, 0, -10], [-10, 5, 5, 10, 10, 5, 5, -10],
+     [-10, 0, 10, 10, 10, 10, 0, -10], [-10, 10, 10, 10, 10, 10, 10, -10], [-10, 5, 0, 0, 0, 0, 5, -10], [-20, -10, -10, -10, -10, -10, -10, -20]],
+    [[0, 0, 0, 0, 0, 0, 0, 0], [5, 10, 10, 10, 10, 10, 10, 5], [-5, 0, 0, 0, 0, 0, 0, -5], [-5, 0, 0, 0, 0, 0, 0, -5],
+     [-5, 0, 0, 0, 0, 0, 0, -5], [-5, 0, 0, 0, 0, 0, 0, -5], [-5, 0, 0, 0, 0, 0, 0, -5], [0, 0, 0, 5, 5, 0, 0, 0]],
+    [[-20, -10, -10, -5, -5, -10, -10, -20], [-10, 0, 0, 0, 0, 0, 0, -10], [-10, 0, 5, 5, 5, 5, 0, -10], [-5, 0, 5, 5, 5, 5, 0, -5],
+     [0, 0, 5, 5, 5, 5, 0, -5], [-10, 5, 5, 5, 5, 5, 0, -10], [-10, 0, 5, 0, 0, 0, 0, -10], [-20, -10, -10, -5, -5, -10, -10, -20]],
+    [[-30, -40, -40, -50, -50, -40, -40, -30], [-30, -40, -40, -50, -50, -40, -40, -30], [-30, -40, -40, -50, -50, -40, -40, -30], [-30, -40, -40, -50, -50, -40, -40, -30],
+     [-20, -30, -30, -40, -40, -30, -30, -20], [-10, -20, -20, -20, -20, -20, -20, -10], [20, 20, 0, 0, 0, 0, 20, 20], [20, 30, 10, 0, 0, 10, 30, 20]],
+]
+# In the endgame pawns are worth more the further they have run and the king belongs in the centre
+PST_ENDGAME = PST_MIDGAME[:]
+PST_ENDGAME[W_PAWN] = [[0, 0, 0, 0, 0, 0, 0, 0], [80, 80, 80, 80, 80, 80, 80, 80], [50, 50, 50, 50, 50, 50, 50, 50], [30, 30, 30, 30, 30, 30, 30, 30],
+                       [20, 20, 20, 20, 20, 20, 20, 20], [10, 10, 10, 10, 10, 10, 10, 10], [0, 0, 0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0, 0, 0]]
+PST_ENDGAME[W_KING] = [[-50, -40, -30, -20, -20, -30, -40, -50], [-30, -20, -10, 0, 0, -10, -20, -30], [-30, -10, 20, 30, 30, 20, -10, -30], [-30, -10, 30, 40, 40, 30, -10, -30],
+                       [-30, -10, 30, 40, 40, 30, -10, -30], [-30, -10, 20, 30, 30, 20, -10, -30], [-30, -30, 0, 0, 0, 0, -30, -30], [-50, -30, -30, -30, -30, -30, -30, -50]]
+# Game phase: 24 with all minor and major pieces on the board, 0 with none
+PHASE_WEIGHTS = [0, 0, 1, 1, 2, 4, 0, 0, 1, 1, 2, 4, 0]
+MAX_PHASE = 24
+
+def _score_tables(pst):
+    # Indexed [piece][row][col]: material plus square bonus, negative for black
+    tables = [[[0] * 8 for _ in range(8)]]
+    for pt in range(1, 7): tables.append([[PIECE_VALUES[pt] + pst[pt][r][c] for c in range(8)] for r in range(8)])
+    for pt in range(1, 7): tables.append([[-(PIECE_VALUES[pt] + pst[pt][7-r][c]) for c in range(8)] for r in range(8)])
+    return tables
+SCORE_MIDGAME = _score_tables(PST_MIDGAME)
+SCORE_ENDGAME = _score_tables(PST_ENDGAME)
+
 class Board:
     def __init__(self):
         self.reset()
@@ -109,18 +194,24 @@ class Board:
         self.en_passant_target = None
         self.winner = None
         self.history = []
+        self.move_stack = []
+        self.legal_cache = None
+        self.check_cache = None
+        self.hash = self.compute_hash()
+        self.mg, self.eg, self.phase = self.compute_eval()
 
     def save_state(self):
         state = ([row[:] for row in self.board], self.turn, self.castling_rights[:], self.en_passant_target, self.winner)
         self.history.append(state)
 
-    def undo(self):
-        if len(self.history) >= 2:
+    def undo(self, plies=2):
+        # plies=1 takes back only the player's move, e.g. while the AI is still thinking
+        if len(self.history) >= 2 and plies == 2:
             self.history.pop() # Pop AI
             prev = self.history.pop() # Pop Player
             self.restore_state(prev)
             return True
-        elif len(self.history) == 1:
+        elif len(self.history) >= 1:
              prev = self.history.pop()
              self.restore_state(prev)
              return True
@@ -130,6 +221,66 @@ class Board:
         self.board, self.turn, self.castling_rights, self.en_passant_target, self.winner = state
         self.board = [row[:] for row in self.board]
         self.castling_rights = self.castling_rights[:]
+        self.legal_cache = None
+        self.hash = self.compute_hash()
+        self.mg, self.eg, self.phase = self.compute_eval()
+
+    def copy(self):
+        # Position-only snapshot (no undo history) that a search can own
+        other = Board()
+        other.restore_state((self.board, self.turn, self.castling_rights, self.en_passant_target, self.winner))
+        return other
+
+    def set_fen(self, fen):
+        parts = fen.split()
+        board = []
+        for rank in parts[0].split('/'):
+            row = []
+            for ch in rank:
+                if ch.isdigit(): row.extend([EMPTY] * int(ch))
+                else: row.append(FEN_PIECES[ch])
+            board.append(row)
+        turn = 'white' if parts[1] == 'w' else 'black'
+        rights = [ch in parts[2] for ch in 'KQkq']
+        ep = None if parts[3] == '-' else parse_square(parts[3])
+        self.history = []
+        self.move_stack = []
+        self.restore_state((board, turn, rights, ep, None))
+
+    def get_fen(self):
+        ranks = []
+        for row in self.board:
+            rank, empty = '', 0
+            for p in row:
+                if p == EMPTY: empty += 1; continue
+                if empty: rank += str(empty); empty = 0
+                rank += FEN_LETTERS[p]
+            ranks.append(rank + (str(empty) if empty else ''))
+        rights = ''.join(ch for ch, ok in zip('KQkq', self.castling_rights) if ok) or '-'
+        ep = square_name(*self.en_passant_target) if self.en_passant_target else '-'
+        return f"{'/'.join(ranks)} {self.turn[0]} {rights} {ep} 0 1"
+
+    def compute_hash(self):
+        h = ZOBRIST_BLACK if self.turn == 'black' else 0
+        for r in range(8):
+            for c in range(8): h ^= ZOBRIST_PIECES[self.board[r][c]][r][c]
+        return h ^ self.flags_hash()
+
+    def compute_eval(self):
+        mg = eg = phase = 0
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                mg += SCORE_MIDGAME[p][r][c]; eg += SCORE_ENDGAME[p][r][c]; phase += PHASE_WEIGHTS[p]
+        return mg, eg, phase
+
+    def flags_hash(self):
+        # Castling rights and en-passant file, xored out and back in around every move
+        h = 0
+        for i in range(4):
+            if self.castling_rights[i]: h ^= ZOBRIST_CASTLING[i]
+        if self.en_passant_target: h ^= ZOBRIST_EP[self.en_passant_target[1]]
+        return h
 
     def get_piece(self, r, c):
         if 0 <= r < 8 and 0 <= c < 8: return self.board[r][c]
@@ -187,133 +338,625 @@ class Board:
                 for dc in [-1, 0, 1]:
                     if dr==0 and dc==0: continue
                     add(r+dr, c+dc)
-            if check_check and not self.is_in_check(is_w):
-                row = 7 if is_w else 0
-                idx = 0 if is_w else 2
-                if self.castling_rights[idx] and self.get_piece(row, 5)==EMPTY and self.get_piece(row, 6)==EMPTY:
-                    moves.append((row, 6))
-                if self.castling_rights[idx+1] and self.get_piece(row, 1)==EMPTY and self.get_piece(row, 2)==EMPTY and self.get_piece(row, 3)==EMPTY:
-                    moves.append((row, 2))
+            row = 7 if is_w else 0
+            idx = 0 if is_w else 2
+            rook = W_ROOK if is_w else B_ROOK
+            if check_check and (r, c) == (row, 4) and (self.castling_rights[idx] or self.castling_rights[idx+1]) \
+                    and not self.is_square_attacked(row, 4, not is_w):
+                # The king may not pass through or land on an attacked square
+                if self.castling_rights[idx] and self.board[row][7] == rook and self.board[row][5] == EMPTY and self.board[row][6] == EMPTY:
+                    if not self.is_square_attacked(row, 5, not is_w) and not self.is_square_attacked(row, 6, not is_w):
+                        moves.append((row, 6))
+                if self.castling_rights[idx+1] and self.board[row][0] == rook and self.board[row][1] == EMPTY and self.board[row][2] == EMPTY and self.board[row][3] == EMPTY:
+                    if not self.is_square_attacked(row, 3, not is_w) and not self.is_square_attacked(row, 2, not is_w):
+                        moves.append((row, 2))
         return moves
 
     def find_king(self, is_white):
         t = W_KING if is_white else B_KING
-        for r in range(8):
-            for c in range(8):
-                if self.board[r][c] == t: return r, c
+        for r, row in enumerate(self.board):
+            if t in row: return r, row.index(t)
         return None
 
+    def is_square_attacked(self, r, c, by_white):
+        b = self.board
+        if by_white: pawn, knight, bishop, rook, queen, king, pr = W_PAWN, W_KNIGHT, W_BISHOP, W_ROOK, W_QUEEN, W_KING, r+1
+        else: pawn, knight, bishop, rook, queen, king, pr = B_PAWN, B_KNIGHT, B_BISHOP, B_ROOK, B_QUEEN, B_KING, r-1
+        if 0 <= pr < 8:
+            if c > 0 and b[pr][c-1] == pawn: return True
+            if c < 7 and b[pr][c+1] == pawn: return True
+        for nr, nc in KNIGHT_TARGETS[r][c]:
+            if b[nr][nc] == knight: return True
+        for nr, nc in KING_TARGETS[r][c]:
+            if b[nr][nc] == king: return True
+        for ray in DIAGONAL_RAYS[r][c]:
+            for nr, nc in ray:
+                p = b[nr][nc]
+                if p != EMPTY:
+                    if p == bishop or p == queen: return True
+                    break
+        for ray in STRAIGHT_RAYS[r][c]:
+            for nr, nc in ray:
+                p = b[nr][nc]
+                if p != EMPTY:
+                    if p == rook or p == queen: return True
+                    break
+        return False
+
     def is_in_check(self, is_white):
         kp = self.find_king(is_white)
         if not kp: return True
-        for r in range(8):
-            for c in range(8):
-                p = self.board[r][c]
-                if p != EMPTY and ((is_white and self.is_black(p)) or (not is_white and self.is_white(p))):
-                    if kp in self.get_valid_moves(p, r, c, False): return True
-        return False
+        return self.is_square_attacked(kp[0], kp[1], not is_white)
+
+    def checked_kings(self):
+        # Squares of kings in check, for drawing; recomputed only when the position changes
+        if self.check_cache is None or self.check_cache[0] != self.hash:
+            squares = []
+            for is_w in (True, False):
+                kp = self.find_king(is_w)
+                if kp and self.is_square_attacked(kp[0], kp[1], not is_w): squares.append(kp)
+            self.check_cache = (self.hash, squares)
+        return self.check_cache[1]
 
     def simulate_move(self, r1, c1, r2, c2):
-        save_board = [row[:] for row in self.board]
-        save_ep = self.en_passant_target
-        self.move_piece_internal(r1, c1, r2, c2)
-        safe = not self.is_in_check(self.is_white(save_board[r1][c1]))
-        self.board = save_board
-        self.en_passant_target = save_ep
+        is_w = self.is_white(self.board[r1][c1])
+        self.push(((r1, c1), (r2, c2)))
+        safe = not self.is_in_check(is_w)
+        self.pop()
         return safe
 
+    def push(self, move):
+        # Reversible make: records just enough to put the position back with pop()
+        (r1, c1), (r2, c2) = move
+        p = self.board[r1][c1]
+        cap_r, cap_c = r2, c2
+        if p in (W_PAWN, B_PAWN) and (r2, c2) == self.en_passant_target: cap_r = r1
+        captured = self.board[cap_r][cap_c]
+        self.move_stack.append((r1, c1, r2, c2, p, captured, cap_r, cap_c,
+                                self.castling_rights[:], self.en_passant_target, self.winner, self.hash,
+                                self.mg, self.eg, self.phase))
+        self.move_piece_internal(r1, c1, r2, c2)
+        self.turn = 'black' if self.turn == 'white' else 'white'
+        self.hash ^= ZOBRIST_BLACK
+        self.legal_cache = None
+
+    def pop(self):
+        (r1, c1, r2, c2, p, captured, cap_r, cap_c, rights, ep, winner,
+         self.hash, self.mg, self.eg, self.phase) = self.move_stack.pop()
+        self.legal_cache = None
+        self.board[r2][c2] = EMPTY
+        self.board[cap_r][cap_c] = captured
+        self.board[r1][c1] = p
+        if p in (W_KING, B_KING) and abs(c2-c1) == 2:
+            if c2 > c1: self.board[r1][7], self.board[r1][5] = self.board[r1][5], EMPTY
+            else: self.board[r1][0], self.board[r1][3] = self.board[r1][3], EMPTY
+        self.castling_rights, self.en_passant_target, self.winner = rights, ep, winner
+        self.turn = 'black' if self.turn == 'white' else 'white'
+
+    def set_piece(self, r, c, p):
+        old = self.board[r][c]
+        self.hash ^= ZOBRIST_PIECES[old][r][c] ^ ZOBRIST_PIECES[p][r][c]
+        self.mg += SCORE_MIDGAME[p][r][c] - SCORE_MIDGAME[old][r][c]
+        self.eg += SCORE_ENDGAME[p][r][c] - SCORE_ENDGAME[old][r][c]
+        self.phase += PHASE_WEIGHTS[p] - PHASE_WEIGHTS[old]
+        self.board[r][c] = p
+
     def move_piece_internal(self, r1, c1, r2, c2):
         p = self.board[r1][c1]
-        self.board[r2][c2] = p
-        self.board[r1][c1] = EMPTY
-        if (p in (W_PAWN, B_PAWN)) and (r2, c2) == self.en_passant_target: self.board[r1][c2] = EMPTY
+        self.hash ^= self.flags_hash()
+        self.set_piece(r2, c2, p)
+        self.set_piece(r1, c1, EMPTY)
+        if (p in (W_PAWN, B_PAWN)) and (r2, c2) == self.en_passant_target: self.set_piece(r1, c2, EMPTY)
         self.en_passant_target = None
         if (p in (W_PAWN, B_PAWN)) and abs(r2-r1) == 2: self.en_passant_target = ((r1+r2)//2, c1)
-        if p == W_PAWN and r2 == 0: self.board[r2][c2] = W_QUEEN
-        if p == B_PAWN and r2 == 7: self.board[r2][c2] = B_QUEEN
+        if p == W_PAWN and r2 == 0: self.set_piece(r2, c2, W_QUEEN)
+        if p == B_PAWN and r2 == 7: self.set_piece(r2, c2, B_QUEEN)
         if p == W_KING:
             self.castling_rights[0] = self.castling_rights[1] = False
-            if c2-c1 == 2: self.board[7][5], self.board[7][7] = self.board[7][7], EMPTY
-            elif c2-c1 == -2: self.board[7][3], self.board[7][0] = self.board[7][0], EMPTY
+            if c2-c1 == 2: self.set_piece(7, 5, self.board[7][7]); self.set_piece(7, 7, EMPTY)
+            elif c2-c1 == -2: self.set_piece(7, 3, self.board[7][0]); self.set_piece(7, 0, EMPTY)
         if p == B_KING:
             self.castling_rights[2] = self.castling_rights[3] = False
-            if c2-c1 == 2: self.board[0][5], self.board[0][7] = self.board[0][7], EMPTY
-            elif c2-c1 == -2: self.board[0][3], self.board[0][0] = self.board[0][0], EMPTY
-        if p == W_ROOK:
-            if r1==7 and c1==0: self.castling_rights[1] = False
-            if r1==7 and c1==7: self.castling_rights[0] = False
-        if p == B_ROOK:
-            if r1==0 and c1==0: self.castling_rights[3] = False
-            if r1==0 and c1==7: self.castling_rights[2] = False
+            if c2-c1 == 2: self.set_piece(0, 5, self.board[0][7]); self.set_piece(0, 7, EMPTY)
+            elif c2-c1 == -2: self.set_piece(0, 3, self.board[0][0]); self.set_piece(0, 0, EMPTY)
+        if (r1, c1) in CORNER_RIGHTS: self.castling_rights[CORNER_RIGHTS[(r1, c1)]] = False
+        if (r2, c2) in CORNER_RIGHTS: self.castling_rights[CORNER_RIGHTS[(r2, c2)]] = False
+        self.hash ^= self.flags_hash()
 
     def make_move(self, r1, c1, r2, c2):
         if self.simulate_move(r1, c1, r2, c2):
             self.save_state()
             self.move_piece_internal(r1, c1, r2, c2)
             self.turn = 'black' if self.turn == 'white' else 'white'
-            has_moves = False
+            self.hash ^= ZOBRIST_BLACK
+            self.legal_cache = None
             is_w = (self.turn == 'white')
-            for r in range(8):
-                for c in range(8):
-                    p = self.board[r][c]
-                    if p!=EMPTY and ((is_w and self.is_white(p)) or (not is_w and self.is_black(p))):
-                        if self.get_valid_moves(p, r, c): has_moves = True; break
-            if not has_moves:
-                self.winner = 'black' if self.is_in_check(is_w) else 'draw' if is_w else 'white'
-                if not is_w and not self.is_in_check(False): self.winner = 'draw'
+            if not self.has_legal_move(is_w):
+                self.winner = ('black' if is_w else 'white') if self.is_in_check(is_w) else 'draw'
             return True
         return False
 
+    def has_legal_move(self, is_white):
+        # Stops at the first legal move; castling never matters as the king could step aside instead
+        if self.legal_cache and self.legal_cache[0] == self.hash and (self.turn == 'white') == is_white:
+            return bool(self.legal_cache[1])
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                if p!=EMPTY and ((is_white and self.is_white(p)) or (not is_white and self.is_black(p))):
+                    for nr, nc in self.get_valid_moves(p, r, c, False):
+                        if self.simulate_move(r, c, nr, nc): return True
+        return False
+
     def get_all_moves(self, is_white):
+        # The side to move's list is generated once per position and kept until the position changes
+        to_move = (self.turn == 'white') == is_white
+        if to_move and self.legal_cache and self.legal_cache[0] == self.hash: return self.legal_cache[1][:]
         moves = []
         for r in range(8):
             for c in range(8):
                 p = self.board[r][c]
                 if p!=EMPTY and ((is_white and self.is_white(p)) or (not is_white and self.is_black(p))):
                     for m in self.get_valid_moves(p, r, c): moves.append(((r,c), m))
+        if to_move: self.legal_cache = (self.hash, moves[:])
         return moves
 
+    def get_moves_from(self, r, c):
+        # Destinations for the piece on (r, c), taken from the cached legal move list
+        return [m[1] for m in self.get_all_moves(self.turn == 'white') if m[0] == (r, c)]
+
+    def get_captures(self, is_white):
+        # Legal captures and promotions only, for the quiescence search
+        caps = []
+        b = self.board
+        for r in range(8):
+            for c in range(8):
+                p = b[r][c]
+                if p!=EMPTY and ((is_white and self.is_white(p)) or (not is_white and self.is_black(p))):
+                    pawn = p in (W_PAWN, B_PAWN)
+                    for nr, nc in self.get_valid_moves(p, r, c, False):
+                        if b[nr][nc] != EMPTY or (pawn and (nr in (0, 7) or (nr, nc) == self.en_passant_target)):
+                            if self.simulate_move(r, c, nr, nc): caps.append(((r,c), (nr,nc)))
+        return caps
+
+    # Move generator check: number of leaf nodes `depth` plies below this position
+    def perft(self, depth):
+        if depth == 0: return 1
+        moves = self.get_all_moves(self.turn == 'white')
+        if depth == 1: return len(moves)
+        nodes = 0
+        for move in moves:
+            self.push(move)
+            nodes += self.perft(depth-1)
+            self.pop()
+        return nodes
+
+    def divide(self, depth):
+        # perft split by root move, for finding which subtree disagrees with a reference count
+        counts = {}
+        for move in self.get_all_moves(self.turn == 'white'):
+            self.push(move)
+            counts[move_to_uci(move)] = self.perft(depth-1)
+            self.pop()
+        return counts
+
+def parse_san(board, san):
+    # Standard algebraic notation for the side to move, e.g. "Nbd7", "exd5", "O-O", "e8=Q+".
+    # Pawns always promote to a queen here, whatever piece the notation asks for.
+    text = san.rstrip('+#!?')
+    is_w = board.turn == 'white'
+    legal = board.get_all_moves(is_w)
+    row = 7 if is_w else 0
+    if text in ('O-O', '0-0'): candidates = [((row, 4), (row, 6))]
+    elif text in ('O-O-O', '0-0-0'): candidates = [((row, 4), (row, 2))]
+    else:
+        text = text.split('=')[0]
+        piece = SAN_PIECES.get(text[:1], W_PAWN)
+        if piece != W_PAWN: text = text[1:]
+        if not is_w: piece += 6
+        if len(text) < 2: raise ValueError(f"bad move {san!r}")
+        dest = parse_square(text[-2:])
+        hint = text[:-2].replace('x', '')
+        candidates = []
+        for m in legal:
+            if m[1] != dest or board.board[m[0][0]][m[0][1]] != piece: continue
+            name = square_name(*m[0])
+            if all(h in name for h in hint): candidates.append(m)
+    candidates = [m for m in candidates if m in legal]
+    if len(candidates) != 1: raise ValueError(f"{'ambiguous' if candidates else 'illegal'} move {san!r}")
+    return candidates[0]
+
 # --- AI ---
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+    # Fixed number of slots indexed by the low bits of the Zobrist key. A slot is
+    # overwritten by a deeper search of any position, by anything from an older
+    # search (generation), or by a new result for the same position.
+    def __init__(self, size_bits=18):
+        self.mask = (1 << size_bits) - 1
+        self.slots = [None] * (1 << size_bits)
+        self.generation = 0
+        self.hits = self.misses = self.collisions = 0
+
+    def new_search(self):
+        self.generation += 1
+        self.hits = self.misses = self.collisions = 0
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+
+    def probe(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is None: self.misses += 1; return None
+        if entry[0] != key: self.collisions += 1; return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, score, bound, move):
+        i = key & self.mask
+        old = self.slots[i]
+        if old is None or old[0] == key or old[5] != self.generation or depth >= old[1]:
+            self.slots[i] = (key, depth, score, bound, move, self.generation)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'collisions': self.collisions}
+
+# book.bin is laid out like a Polyglot book, so it can be searched without being loaded:
+# big-endian (Zobrist hash, encode_move, weight) records after "CHESSBK1", sorted by hash
+# and then move. A position with several book moves has one record per move, and the
+# lower-bound binary search finds the first. Any change to the Zobrist keys needs a rebuild.
+BOOK_MAGIC = b"CHESSBK1"
+BOOK_RECORD = struct.Struct(">QHH")
+
+def encode_move(move):
+    (r1, c1), (r2, c2) = move
+    return (r1*8 + c1) * 64 + r2*8 + c2
+
+def decode_move(code):
+    return divmod(code // 64, 8), divmod(code % 64, 8)
+
+class OpeningBook:
+    # book.bin memory-mapped: only the records a lookup touches are read from disk
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(BOOK_MAGIC)] != BOOK_MAGIC: raise ValueError(f"{path} is not an opening book")
+        self.count = (len(self.data) - len(BOOK_MAGIC)) // BOOK_RECORD.size
+
+    @classmethod
+    def load(cls, path=BOOK_FILE):
+        return cls(path) if os.path.exists(path) else None
+
+    def _key_at(self, i):
+        return BOOK_RECORD.unpack_from(self.data, len(BOOK_MAGIC) + i * BOOK_RECORD.size)[0]
+
+    def entries(self, key):
+        # (move, weight) pairs stored for the position
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key: lo = mid + 1
+            else: hi = mid
+        found = []
+        while lo < self.count:
+            k, code, weight = BOOK_RECORD.unpack_from(self.data, len(BOOK_MAGIC) + lo * BOOK_RECORD.size)
+            if k != key: break
+            found.append((decode_move(code), weight))
+            lo += 1
+        return found
+
+    def pick(self, board):
+        # Weighted random choice among the book moves that are legal here, or None
+        legal = board.get_all_moves(board.turn == 'white')
+        choices = [(m, w) for m, w in self.entries(board.hash) if m in legal]
+        if not choices: return None
+        return random.choices([m for m, _ in choices], [w for _, w in choices])[0]
+
+INF = 1000000
+MATE = 100000
+PIECE_RANK = [0, 1, 3, 3, 5, 9, 20, 1, 3, 3, 5, 9, 20]   # For MVV-LVA capture ordering
+
+class SearchTimeout(Exception): pass
+
 class AI:
-    def __init__(self):
-        self.values = {EMPTY:0, W_PAWN:10, W_KNIGHT:30, W_BISHOP:30, W_ROOK:50, W_QUEEN:90, W_KING:900,
-                       B_PAWN:-10, B_KNIGHT:-30, B_BISHOP:-30, B_ROOK:-50, B_QUEEN:-90, B_KING:-900}
+    def __init__(self, tt_bits=18, tapered=True, book=None, workers=1):
+        self.tt_bits = tt_bits
+        self.tapered = tapered
+        self.book = book
+        self.workers = workers
+        self.pool = None
+        self.pool_stop = None   # Event shared with the pool processes; set, their searches stop
+        self.tt = TranspositionTable(tt_bits)
+        self.deadline = None
+        self.cancelled = False
+        self.stop = None        # In a pool process, the parent's pool_stop
+        self.pv = []
+        self.pv_moves = {}
+        self.depth_reached = 0
+        self.score = 0
+        self.reset_stats()
     
-    def evaluate(self, board): return sum(self.values.get(c, 0) for row in board.board for c in row)
+    # O(1): the board keeps its material and piece-square sums up to date as pieces move.
+    # Tapered blends the middlegame and endgame tables by how much material is left.
+    def evaluate(self, board):
+        if not self.tapered: return board.mg
+        phase = min(board.phase, MAX_PHASE)
+        return (board.mg * phase + board.eg * (MAX_PHASE - phase)) // MAX_PHASE
 
-    def get_best_move(self, board, depth=2):
-        moves = board.get_all_moves(False)
+    def reset_stats(self):
+        self.nodes = self.qnodes = 0
+        self.interior = self.cutoffs = self.first_cutoffs = 0
+
+    def stats(self):
+        # Cutoff rate: share of searched nodes that failed high; first-move rate: share of those
+        # cutoffs made by the first move tried, i.e. how good the ordering is
+        return {'nodes': self.nodes, 'qnodes': self.qnodes, 'cutoffs': self.cutoffs,
+                'cutoff_rate': self.cutoffs / self.interior if self.interior else 0.0,
+                'first_move_rate': self.first_cutoffs / self.cutoffs if self.cutoffs else 0.0}
+
+    # The search plays moves on the board it is given with push()/pop() and leaves it as it found it.
+    # Fixed depth, or with time_limit (ms) deepen 1, 2, 3... until the budget runs out and answer
+    # with the last completed iteration.
+    def get_best_move(self, board, depth=2, time_limit=None):
+        self.new_search(board)
+        moves = board.get_all_moves(board.turn == 'white')
         if not moves: return None
-        best, best_move = 99999, random.choice(moves)
-        for s, e in moves:
-            tmp = copy.deepcopy(board)
-            tmp.make_move(s[0], s[1], e[0], e[1])
-            val = self.minimax(tmp, depth-1, -10000, 10000, True)
-            if val < best: best, best_move = val, (s, e)
+        if self.book:
+            move = self.book.pick(board)
+            if move: return move
+        self.order_moves(board, moves, None, 0)
+        start = time.perf_counter()
+        max_depth = depth if time_limit is None else MAX_SEARCH_DEPTH
+        base = len(board.move_stack)
+        best_move = moves[0]
+        for d in range(1, max_depth + 1):
+            # The first iteration always completes so there is a move to play
+            self.deadline = start + time_limit / 1000 if time_limit is not None and d > 1 else None
+            if best_move in moves:
+                moves.remove(best_move)
+                moves.insert(0, best_move)
+            try:
+                if self.workers > 1: best_move, self.score = self.search_root_parallel(board, d, moves)
+                else: best_move, self.score = self.search_root(board, d, moves)
+            except SearchTimeout:
+                while len(board.move_stack) > base: board.pop()
+                if self.cancelled: best_move = None
+                break
+            self.depth_reached = d
+            self.collect_pv(board)
+            if abs(self.score) >= MATE: break
+        self.deadline = None
         return best_move
 
+    def new_search(self, board):
+        self.reset_stats()
+        self.tt.new_search()
+        self.pv, self.pv_moves = [], {}
+        self.depth_reached, self.score = 0, 0
+        self.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 1)]
+        self.history_scores = {}
+        self.root_ply = len(board.move_stack)
+
+    def search_root_parallel(self, board, depth, moves):
+        # Root split: the first move is searched alone to get a bound, then the rest go out in
+        # batches of one move per worker, each batch searched with the best window found so far.
+        # The pool processes search with this AI's settings.
+        if self.pool is None:
+            self.pool_stop = multiprocessing.Event()
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_pool_ai,
+                                            initargs=(self.tt_bits, self.tapered, self.pool_stop))
+        is_max = board.turn == 'white'
+        fen = board.get_fen()
+        alpha, beta = -INF, INF
+        best_move = moves[0]
+        batches = [moves[:1]] + [moves[i:i+self.workers] for i in range(1, len(moves), self.workers)]
+        for batch in batches:
+            self.check_time()
+            time_left = self.deadline - time.perf_counter() if self.deadline else None
+            futures = [(move, self.pool.submit(_search_root_move, fen, move, depth, alpha, beta, time_left)) for move in batch]
+            self.wait_for(future for _, future in futures)
+            results = [(move, future.result()) for move, future in futures]
+            for move, (val, nodes) in results:
+                self.nodes += nodes
+                if val is None: raise SearchTimeout
+                if is_max and val > alpha: alpha, best_move = val, move
+                if not is_max and val < beta: beta, best_move = val, move
+        score = alpha if is_max else beta
+        self.tt.store(board.hash, depth, score, EXACT, best_move)
+        return best_move, score
+
+    def wait_for(self, futures):
+        # Wait on a batch without missing a cancel: on one, stop the searches already running
+        # in the pool, drop the rest and raise SearchTimeout
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=POOL_POLL)
+            if self.cancelled and pending:
+                for future in pending: future.cancel()
+                self.pool_stop.set()
+                wait(pending)
+                self.pool_stop.clear()
+                raise SearchTimeout
+
+    def close(self):
+        if self.pool: self.pool.shutdown(cancel_futures=True); self.pool = None
+
+    def search_root(self, board, depth, moves):
+        is_max = board.turn == 'white'
+        alpha, beta = -INF, INF
+        best_move = moves[0]
+        for move in moves:
+            board.push(move)
+            val = self.minimax(board, depth-1, alpha, beta, not is_max)
+            board.pop()
+            if is_max and val > alpha: alpha, best_move = val, move
+            if not is_max and val < beta: beta, best_move = val, move
+        score = alpha if is_max else beta
+        self.tt.store(board.hash, depth, score, EXACT, best_move)
+        return best_move, score
+
+    def collect_pv(self, board):
+        # Walk the best moves stored in the table; the next iteration searches these first
+        self.pv, self.pv_moves = [], {}
+        for _ in range(self.depth_reached):
+            entry = self.tt.slots[board.hash & self.tt.mask]
+            if not entry or entry[0] != board.hash or entry[4] is None: break
+            if entry[4] not in board.get_all_moves(board.turn == 'white'): break
+            self.pv_moves[board.hash] = entry[4]
+            self.pv.append(entry[4])
+            board.push(entry[4])
+        for _ in self.pv: board.pop()
+
+    def order_moves(self, board, moves, first, ply):
+        # PV/table move, then captures by MVV-LVA, then killers, then quiet moves by history score
+        b = board.board
+        killers = self.killers[ply]
+        history = self.history_scores
+        def key(move):
+            if move == first: return 1 << 30
+            (r1, c1), (r2, c2) = move
+            victim = b[r2][c2]
+            if victim != EMPTY: return (1 << 24) + PIECE_RANK[victim] * 32 - PIECE_RANK[b[r1][c1]]
+            if move == killers[0]: return (1 << 23) + 1
+            if move == killers[1]: return 1 << 23
+            return history.get(move, 0)
+        moves.sort(key=key, reverse=True)
+
+    def check_time(self):
+        if self.cancelled or (self.deadline and time.perf_counter() > self.deadline): raise SearchTimeout
+        if self.stop and self.stop.is_set(): raise SearchTimeout
+
     def minimax(self, board, depth, alpha, beta, is_max):
-        if depth == 0 or board.winner: return self.evaluate(board)
+        if depth == 0 or board.winner: return self.quiesce(board, alpha, beta, is_max)
+        self.nodes += 1
+        if self.nodes & 255 == 0: self.check_time()
+        key = board.hash
+        entry = self.tt.probe(key)
+        first = self.pv_moves.get(key)
+        if entry:
+            if first is None: first = entry[4]
+            if entry[1] >= depth:
+                score, bound = entry[2], entry[3]
+                if bound == EXACT: return score
+                if bound == LOWER: alpha = max(alpha, score)
+                else: beta = min(beta, score)
+                if beta <= alpha: return score
         moves = board.get_all_moves(is_max)
-        if not moves: return self.evaluate(board)
-        if is_max:
-            val = -99999
-            for s, e in moves:
-                tmp = copy.deepcopy(board)
-                tmp.make_move(s[0], s[1], e[0], e[1])
-                val = max(val, self.minimax(tmp, depth-1, alpha, beta, False))
+        if not moves:
+            # Mated or stalemated; a mate found with more depth left is a quicker mate
+            if board.is_in_check(is_max): return -(MATE + depth) if is_max else MATE + depth
+            return 0
+        ply = len(board.move_stack) - self.root_ply
+        self.order_moves(board, moves, first, ply)
+        self.interior += 1
+        alpha0, beta0 = alpha, beta
+        best_move = None
+        val = -INF if is_max else INF
+        for i, move in enumerate(moves):
+            quiet = board.board[move[1][0]][move[1][1]] == EMPTY
+            board.push(move)
+            child = self.minimax(board, depth-1, alpha, beta, not is_max)
+            board.pop()
+            if is_max:
+                if child > val: val, best_move = child, move
                 alpha = max(alpha, val)
-                if beta <= alpha: break
-            return val
+            else:
+                if child < val: val, best_move = child, move
+                beta = min(beta, val)
+            if beta <= alpha:
+                self.cutoffs += 1
+                if i == 0: self.first_cutoffs += 1
+                if quiet:
+                    killers = self.killers[ply]
+                    if killers[0] != move: killers[1], killers[0] = killers[0], move
+                    self.history_scores[move] = self.history_scores.get(move, 0) + depth * depth
+                break
+        bound = UPPER if val <= alpha0 else LOWER if val >= beta0 else EXACT
+        self.tt.store(key, depth, val, bound, best_move)
+        return val
+
+    def quiesce(self, board, alpha, beta, is_max):
+        # Leaves keep resolving captures until the position is quiet, then stand pat on the evaluation
+        self.nodes += 1
+        self.qnodes += 1
+        if self.nodes & 255 == 0: self.check_time()
+        val = self.evaluate(board)
+        if is_max:
+            if val >= beta: return val
+            alpha = max(alpha, val)
         else:
-            val = 99999
-            for s, e in moves:
-                tmp = copy.deepcopy(board)
-                tmp.make_move(s[0], s[1], e[0], e[1])
-                val = min(val, self.minimax(tmp, depth-1, alpha, beta, True))
+            if val <= alpha: return val
+            beta = min(beta, val)
+        caps = board.get_captures(is_max)
+        self.order_moves(board, caps, None, 0)
+        for move in caps:
+            board.push(move)
+            child = self.quiesce(board, alpha, beta, not is_max)
+            board.pop()
+            if is_max:
+                if child > val: val = child
+                alpha = max(alpha, val)
+            else:
+                if child < val: val = child
                 beta = min(beta, val)
-                if beta <= alpha: break
-            return val
+            if beta <= alpha: break
+        return val
+
+_pool_ai = None
+
+def _init_pool_ai(tt_bits, tapered, stop):
+    # Runs once in each pool process: its AI, set up like the one that owns the pool
+    global _pool_ai
+    _pool_ai = AI(tt_bits, tapered)
+    _pool_ai.stop = stop
+
+def _search_root_move(fen, move, depth, alpha, beta, time_left):
+    # Runs in a pool process. The board arrives as a FEN string; the process keeps one AI,
+    # and so its transposition table, across the moves it is handed.
+    ai = _pool_ai
+    board = Board()
+    board.set_fen(fen)
+    ai.new_search(board)
+    ai.deadline = time.perf_counter() + time_left if time_left is not None else None
+    is_max = board.turn == 'white'
+    board.push(move)
+    try: val = ai.minimax(board, depth-1, alpha, beta, not is_max)
+    except SearchTimeout: val = None
+    ai.deadline = None
+    return val, ai.nodes
+
+class SearchWorker:
+    # Runs the AI on a snapshot of the board in a background thread so the window keeps
+    # handling events and redrawing while it thinks
+    def __init__(self, ai):
+        self.ai = ai
+        self.thread = None
+        self.result = None
+
+    def start(self, board, time_limit):
+        self.ai.cancelled = False
+        self.thread = threading.Thread(target=self._run, args=(board.copy(), time_limit), daemon=True)
+        self.thread.start()
+
+    def _run(self, board, time_limit):
+        self.result = self.ai.get_best_move(board, time_limit=time_limit)
+
+    def busy(self): return self.thread is not None
+
+    def poll(self):
+        # (True, move) once the search has finished, else (False, None)
+        if self.thread is None or self.thread.is_alive(): return False, None
+        self.thread = None
+        move, self.result = self.result, None
+        return True, move
+
+    def cancel(self):
+        if self.thread is None: return
+        self.ai.cancelled = True
+        self.thread.join()
+        self.thread = None
+        self.result = None
 
 # --- GRAPHICS ---
 def draw_piece(surface, piece, cx, cy, s):
@@ -359,28 +1002,48 @@ def draw_piece(surface, piece, cx, cy, s):
         pygame.draw.rect(surface, fill, (cx-0.12*s, cy-0.3*s, 0.24*s, 0.08*s))
         pygame.draw.rect(surface, border, (cx-0.12*s, cy-0.3*s, 0.24*s, 0.08*s), 2)
 
+# Everything that looks the same from frame to frame is rendered once per square size and blitted
+_sprites = {}
+
+def _cached(key, size, render, alpha=True):
+    if key not in _sprites:
+        surf = pygame.Surface(size, pygame.SRCALPHA if alpha else 0)
+        render(surf)
+        if pygame.display.get_surface(): surf = surf.convert_alpha() if alpha else surf.convert()
+        _sprites[key] = surf
+    return _sprites[key]
+
+def piece_sprite(piece, s):
+    return _cached(('piece', piece, s), (s, s), lambda surf: draw_piece(surf, piece, s//2, s//2, s))
+
+def hint_sprite(s):
+    return _cached(('hint', s), (s, s), lambda surf: pygame.draw.circle(surf, MOVE_HINT, (s//2, s//2), 14))
+
+def label_sprite(text, color):
+    return _cached(('label', text, color), (6, 7), lambda surf: draw_text(surf, text, 0, 0, 1, color))
+
+def squares_sprite(s):
+    def render(surf):
+        for r in range(8):
+            for c in range(8):
+                pygame.draw.rect(surf, LIGHT_SQUARE if (r+c)%2==0 else DARK_SQUARE, (c*s, r*s, s, s))
+    return _cached(('squares', s), (8*s, 8*s), render, alpha=False)
+
 def draw_board(screen, board, selected, moves):
+    s = SQUARE_SIZE
+    screen.blit(squares_sprite(s), (0, 0))
+    if selected: pygame.draw.rect(screen, HIGHLIGHT, (selected[1]*s, selected[0]*s, s, s))
+    for r, c in board.checked_kings(): pygame.draw.rect(screen, CHECK_RED, (c*s, r*s, s, s))
+    # Coords via Pixel Text, in the colour of the opposite square
+    for i in range(8):
+        screen.blit(label_sprite(str(8-i), DARK_SQUARE if i%2==0 else LIGHT_SQUARE), (2, i*s+2))
+        screen.blit(label_sprite(chr(97+i), DARK_SQUARE if (7+i)%2==0 else LIGHT_SQUARE), (i*s+s-10, 8*s-10))
+    hint = hint_sprite(s)
+    for r, c in moves: screen.blit(hint, (c*s, r*s))
     for r in range(8):
         for c in range(8):
-            col = LIGHT_SQUARE if (r+c)%2==0 else DARK_SQUARE
-            if selected == (r,c): col = HIGHLIGHT
             p = board.board[r][c]
-            if p in (W_KING, B_KING):
-                if board.is_in_check(p==W_KING): col = CHECK_RED
-            
-            pygame.draw.rect(screen, col, (c*SQUARE_SIZE, r*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-            
-            # Coords via Pixel Text
-            if c==0: draw_text(screen, str(8-r), 2, r*SQUARE_SIZE+2, 1, DARK_SQUARE if (r+c)%2==0 else LIGHT_SQUARE)
-            if r==7: draw_text(screen, chr(97+c), c*SQUARE_SIZE+SQUARE_SIZE-10, HEIGHT-10, 1, DARK_SQUARE if (r+c)%2==0 else LIGHT_SQUARE)
-
-            if (r,c) in moves:
-                s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-                pygame.draw.circle(s, MOVE_HINT, (SQUARE_SIZE//2, SQUARE_SIZE//2), 14)
-                screen.blit(s, (c*SQUARE_SIZE, r*SQUARE_SIZE))
-
-            if p != EMPTY:
-                draw_piece(screen, p, c*SQUARE_SIZE + SQUARE_SIZE//2, r*SQUARE_SIZE + SQUARE_SIZE//2, SQUARE_SIZE)
+            if p != EMPTY: screen.blit(piece_sprite(p, s), (c*s, r*s))
 
 def draw_game_over(screen, winner):
     overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
@@ -398,25 +1061,29 @@ def main():
     clock = pygame.time.Clock()
     
     board = Board()
-    ai = AI()
+    ai = AI(book=OpeningBook.load(), workers=AI_WORKERS)
+    worker = SearchWorker(ai)
     selected = None
     moves = []
     
     while True:
         clock.tick(30)
-        if not board.winner and board.turn == 'black':
-            draw_board(screen, board, selected, moves)
-            pygame.display.flip()
-            move = ai.get_best_move(board)
+        if not board.winner and board.turn == 'black' and not worker.busy():
+            worker.start(board, AI_TIME_LIMIT)
+        done, move = worker.poll()
+        if done:
             if move: board.make_move(move[0][0], move[0][1], move[1][0], move[1][1])
             else: board.winner = 'white' if not board.winner else board.winner
 
         for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+            if event.type == pygame.QUIT: worker.cancel(); ai.close(); pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r: board.reset(); selected = None; moves = []
+                if event.key == pygame.K_r: worker.cancel(); board.reset(); selected = None; moves = []
                 if event.key == pygame.K_u:
-                    if board.undo(): selected = None; moves = []; board.winner = None
+                    # While the AI is thinking only the player's move is on top of the history
+                    plies = 1 if worker.busy() else 2
+                    worker.cancel()
+                    if board.undo(plies): selected = None; moves = []; board.winner = None
 
             if event.type == pygame.MOUSEBUTTONDOWN and not board.winner and board.turn == 'white':
                 c = event.pos[0] // SQUARE_SIZE
@@ -427,11 +1094,11 @@ def main():
                         selected = None; moves = []
                     else:
                         p = board.get_piece(r, c)
-                        if p and board.is_white(p): selected = (r,c); moves = board.get_valid_moves(p, r, c)
+                        if p and board.is_white(p): selected = (r,c); moves = board.get_moves_from(r, c)
                         else: selected = None; moves = []
                 else:
                     p = board.get_piece(r, c)
-                    if p and board.is_white(p): selected = (r,c); moves = board.get_valid_moves(p, r, c)
+                    if p and board.is_white(p): selected = (r,c); moves = board.get_moves_from(r, c)
 
         draw_board(screen, board, selected, moves)
         if board.winner: draw_game_over(screen, board.winner)
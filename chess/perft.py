@@ -0,0 +1,54 @@
+"""Perft and divide counts for the chess move generator, checked against published numbers.
+
+    python3 perft.py [--max-depth 4]
+    python3 perft.py --divide 3 [--fen FEN]
+
+Pawns always promote to a queen here, so the reference depths stop short of promotions.
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from chess import Board, START_FEN
+
+# (name, FEN, node counts for depth 1, 2, 3, ...)
+REFERENCE = [
+    ('start', START_FEN, [20, 400, 8902, 197281]),
+    ('kiwipete', "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862]),
+    ('position3', "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    ('position6', "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079, 89890]),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-depth', type=int, default=3)
+    parser.add_argument('--divide', type=int, metavar='DEPTH', help="print per-move counts for --fen")
+    parser.add_argument('--fen', default=START_FEN)
+    args = parser.parse_args()
+
+    board = Board()
+    if args.divide:
+        board.set_fen(args.fen)
+        counts = board.divide(args.divide)
+        for move in sorted(counts): print(f"{move}: {counts[move]}")
+        print(f"\nmoves: {len(counts)}  nodes: {sum(counts.values())}")
+        return
+
+    failed = False
+    print(f"{'position':<12}{'depth':>6}{'nodes':>10}{'expected':>10}{'seconds':>10}{'nodes/s':>10}")
+    for name, fen, expected in REFERENCE:
+        for depth, want in enumerate(expected[:args.max_depth], 1):
+            board.set_fen(fen)
+            start = time.perf_counter()
+            nodes = board.perft(depth)
+            elapsed = time.perf_counter() - start
+            mark = '' if nodes == want else '  MISMATCH'
+            failed = failed or nodes != want
+            print(f"{name:<12}{depth:>6}{nodes:>10}{want:>10}{elapsed:>10.2f}{nodes / max(elapsed, 1e-9):>10.0f}{mark}")
+            sys.stdout.flush()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Frame-time benchmark for the chess board renderer (uses SDL's dummy video driver).
+
+Compares draw_board, which blits cached sprites, against the original
+renderer, which rasterised every piece and hint every frame.
+
+    python3 render_bench.py [--frames 300]
+"""
+import os
+import time
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from chess import *
+from bench import setup, POSITIONS, OriginalBoard
+
+def legacy_draw_board(screen, board, selected, moves):
+    # draw_board as it was before the sprite cache, drawn on an OriginalBoard so the check
+    # highlight also pays for the original is_in_check (draw_piece and draw_text are unchanged)
+    for r in range(8):
+        for c in range(8):
+            col = LIGHT_SQUARE if (r+c)%2==0 else DARK_SQUARE
+            if selected == (r,c): col = HIGHLIGHT
+            p = board.board[r][c]
+            if p in (W_KING, B_KING):
+                if board.is_in_check(p==W_KING): col = CHECK_RED
+            pygame.draw.rect(screen, col, (c*SQUARE_SIZE, r*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+            if c==0: draw_text(screen, str(8-r), 2, r*SQUARE_SIZE+2, 1, DARK_SQUARE if (r+c)%2==0 else LIGHT_SQUARE)
+            if r==7: draw_text(screen, chr(97+c), c*SQUARE_SIZE+SQUARE_SIZE-10, HEIGHT-10, 1, DARK_SQUARE if (r+c)%2==0 else LIGHT_SQUARE)
+            if (r,c) in moves:
+                s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+                pygame.draw.circle(s, MOVE_HINT, (SQUARE_SIZE//2, SQUARE_SIZE//2), 14)
+                screen.blit(s, (c*SQUARE_SIZE, r*SQUARE_SIZE))
+            if p != EMPTY:
+                draw_piece(screen, p, c*SQUARE_SIZE + SQUARE_SIZE//2, r*SQUARE_SIZE + SQUARE_SIZE//2, SQUARE_SIZE)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    print(f"{'position':<12}{'renderer':<10}{'ms/frame':>10}{'fps':>10}")
+    for name, moves in POSITIONS.items():
+        board = setup(moves)
+        # A selected knight with its move hints, as while the player is choosing a move
+        r, c = next((r, c) for r in range(8) for c in range(8) if board.board[r][c] == B_KNIGHT)
+        selected, hints = (r, c), board.get_moves_from(r, c)
+        for label, draw, board in (('legacy', legacy_draw_board, setup(moves, OriginalBoard)),
+                                   ('sprites', draw_board, board)):
+            draw(screen, board, selected, hints)
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                draw(screen, board, selected, hints)
+                pygame.display.flip()
+            ms = (time.perf_counter() - start) * 1000 / args.frames
+            print(f"{name:<12}{label:<10}{ms:>10.2f}{1000 / ms:>10.0f}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
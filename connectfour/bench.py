@@ -0,0 +1,345 @@
+"""Speed of the Connect Four AI against the grid search, with its solver, leaf scorers and variants.
+
+    python3 bench.py [--depths 4 5 6 7] [--baseline-max 5] [--repeat 3] [--budget 1.0] [--leaves 2000]
+                     [--variants 7x6:4 9x7:5] [--variant-depth 8]
+
+Times are the best of --repeat runs; "speedup" is the grid search's time over the AI's.
+"""
+import os
+import sys
+import copy
+import math
+import time
+import random
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from connectfour import (AI, Board, BitBoard, Solver, Variant, CLASSIC, PLAYER_PIECE, AI_PIECE, EMPTY,
+                         ROW_COUNT, COLUMN_COUNT, WINDOW_LENGTH, DIRECTIONS)
+
+try:
+    import numpy as np
+except ImportError:   # Optional: only score_batch needs it
+    np = None
+
+# Columns played from the empty board, the player moving first; the AI is to move next
+POSITIONS = {
+    'opening': [3],
+    'early': [3, 3, 2, 4, 4],
+    'midgame': [3, 3, 2, 4, 4, 2, 5, 1, 1, 5, 3, 4, 6],
+}
+
+# The midgame played on, for the solver
+ENDGAMES = {
+    'late': [3, 3, 2, 4, 4, 2, 5, 1, 1, 5, 3, 4, 6, 3, 3, 4],
+    'endgame': [3, 3, 2, 4, 4, 2, 5, 1, 1, 5, 3, 4, 6, 3, 3, 4, 4, 3, 4, 0],
+}
+
+def board_from_moves(moves, board_class=Board, variant=CLASSIC):
+    board = board_class(variant)
+    piece = PLAYER_PIECE
+    for col in moves:
+        board.drop_piece(board.get_next_open_row(col), col, piece)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return board
+
+def grid_lines(variant):
+    # Every line of `connect` cells on the grid (69 on 7x6 connect four)
+    rows, columns, connect = variant.rows, variant.columns, variant.connect
+    return [[(r + dr * i, c + dc * i) for i in range(connect)]
+            for dr, dc in DIRECTIONS for r in range(rows) for c in range(columns)
+            if 0 <= r + dr * (connect - 1) < rows and c + dc * (connect - 1) < columns]
+
+class CountingBoard(Board):
+    # The Board keeping, per side, how many of its stones lie in each line and the sum of the
+    # line values, updated by drop_piece and take_back so a leaf's score only adds them up
+    cell_lines = {}   # Per variant: the lines through each cell, and the number of lines
+
+    def __init__(self, variant=CLASSIC):
+        super().__init__(variant)
+        if variant not in self.cell_lines:
+            lines = grid_lines(variant)
+            self.cell_lines[variant] = ([[[i for i, line in enumerate(lines) if (r, c) in line]
+                                          for c in range(variant.columns)] for r in range(variant.rows)], len(lines))
+        self.lines_through, line_count = self.cell_lines[variant]
+        self.history = []   # (row, col, piece) per move, for takebacks
+        self.line_counts = {PLAYER_PIECE: [0] * line_count, AI_PIECE: [0] * line_count}
+        self.line_scores = {PLAYER_PIECE: 0, AI_PIECE: 0}
+        self.center_counts = {PLAYER_PIECE: 0, AI_PIECE: 0}
+
+    def drop_piece(self, row, col, piece):
+        self.grid[row][col] = piece
+        self.history.append((row, col, piece))
+        self._count(row, col, piece, 1)
+
+    def take_back(self):
+        # Remove the last piece dropped; returns it
+        row, col, piece = self.history.pop()
+        self.grid[row][col] = EMPTY
+        self._count(row, col, piece, -1)
+        return piece
+
+    def _count(self, row, col, piece, step):
+        # Move `piece` in or out of every line through the cell, rescoring those lines
+        other = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        own_counts, opp_counts = self.line_counts[piece], self.line_counts[other]
+        values = self.variant.line_values
+        own_delta = opp_delta = 0
+        for line in self.lines_through[row][col]:
+            own, opp = own_counts[line], opp_counts[line]
+            own_counts[line] = own + step
+            own_delta += values[own + step][opp] - values[own][opp]
+            opp_delta += values[opp][own + step] - values[opp][own]
+        self.line_scores[piece] += own_delta
+        self.line_scores[other] += opp_delta
+        if col == self.variant.center: self.center_counts[piece] += step
+
+    def score(self, piece):
+        # Center column preference plus every line's value, from the running counts
+        return self.center_counts[piece] * 3 + self.line_scores[piece]
+
+batch_tables = {}   # score_batch's, per variant, made on first use
+
+def score_batch(grids, piece, variant=CLASSIC):
+    # The window scorer for many boards at once with NumPy: `grids` is array-like, shaped
+    # (boards, rows, columns) like Board.grid. Each side's stones are multiplied by a
+    # cell-by-line matrix (in floats, which NumPy multiplies fastest) to count them per
+    # line, and the line values are looked up for every line of every board in one go.
+    if variant not in batch_tables:
+        lines = grid_lines(variant)
+        cells = np.zeros((variant.cell_count, len(lines)), dtype=np.float32)
+        for i, line in enumerate(lines):
+            for r, c in line: cells[r * variant.columns + c, i] = 1
+        batch_tables[variant] = cells, np.array(variant.line_values, dtype=np.int64).ravel()
+    cells, values = batch_tables[variant]
+    grids = np.asarray(grids, dtype=np.int8).reshape(-1, variant.cell_count)
+    own = grids == piece
+    opp = (grids != piece) & (grids != EMPTY)
+    own_counts = (own.astype(np.float32) @ cells).astype(np.intp)
+    opp_counts = (opp.astype(np.float32) @ cells).astype(np.intp)
+    center = own.reshape(-1, variant.rows, variant.columns)[:, :, variant.center].sum(axis=1)
+    return values[own_counts * (variant.connect + 1) + opp_counts].sum(axis=1) + center * 3
+
+class GridBoard(Board):
+    # The board's original win scan, on 7x6 only
+    def winning_move(self, piece):
+        # Horizontal
+        for c in range(COLUMN_COUNT-3):
+            for r in range(ROW_COUNT):
+                if self.grid[r][c] == piece and self.grid[r][c+1] == piece and self.grid[r][c+2] == piece and self.grid[r][c+3] == piece:
+                    return True
+        # Vertical
+        for c in range(COLUMN_COUNT):
+            for r in range(ROW_COUNT-3):
+                if self.grid[r][c] == piece and self.grid[r+1][c] == piece and self.grid[r+2][c] == piece and self.grid[r+3][c] == piece:
+                    return True
+        # Pos Diag
+        for c in range(COLUMN_COUNT-3):
+            for r in range(ROW_COUNT-3):
+                if self.grid[r][c] == piece and self.grid[r+1][c+1] == piece and self.grid[r+2][c+2] == piece and self.grid[r+3][c+3] == piece:
+                    return True
+        # Neg Diag
+        for c in range(COLUMN_COUNT-3):
+            for r in range(3, ROW_COUNT):
+                if self.grid[r][c] == piece and self.grid[r-1][c+1] == piece and self.grid[r-2][c+2] == piece and self.grid[r-3][c+3] == piece:
+                    return True
+        return False
+
+class GridAI(AI):
+    # The search before the bitboard engine: one deep copy per child, three full win scans
+    # per node and the list-building scorer at the leaves
+    def evaluate_window(self, window, piece):
+        score = 0
+        opp_piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+
+        if window.count(piece) == 4: score += 100
+        elif window.count(piece) == 3 and window.count(EMPTY) == 1: score += 5
+        elif window.count(piece) == 2 and window.count(EMPTY) == 2: score += 2
+
+        if window.count(opp_piece) == 3 and window.count(EMPTY) == 1: score -= 4
+
+        return score
+
+    def score_position(self, board, piece):
+        score = 0
+        grid = board.grid
+        center_array = [i[COLUMN_COUNT//2] for i in grid]
+        score += center_array.count(piece) * 3
+        for r in range(ROW_COUNT):
+            row_array = grid[r]
+            for c in range(COLUMN_COUNT-3):
+                score += self.evaluate_window(row_array[c:c+WINDOW_LENGTH], piece)
+        for c in range(COLUMN_COUNT):
+            col_array = [grid[r][c] for r in range(ROW_COUNT)]
+            for r in range(ROW_COUNT-3):
+                score += self.evaluate_window(col_array[r:r+WINDOW_LENGTH], piece)
+        for r in range(ROW_COUNT-3):
+            for c in range(COLUMN_COUNT-3):
+                score += self.evaluate_window([grid[r+i][c+i] for i in range(WINDOW_LENGTH)], piece)
+                score += self.evaluate_window([grid[r+3-i][c+i] for i in range(WINDOW_LENGTH)], piece)
+        return score
+
+    def is_terminal_node(self, board):
+        return board.winning_move(PLAYER_PIECE) or board.winning_move(AI_PIECE) or len(self.get_valid_locations(board)) == 0
+
+    def get_valid_locations(self, board):
+        valid_locations = []
+        for col in range(COLUMN_COUNT):
+            if board.is_valid_location(col):
+                valid_locations.append(col)
+        return valid_locations
+
+    def minimax(self, board, depth, alpha, beta, maximizingPlayer):
+        self.nodes += 1
+        valid_locations = self.get_valid_locations(board)
+        is_terminal = self.is_terminal_node(board)
+        if depth == 0 or is_terminal:
+            if is_terminal:
+                if board.winning_move(AI_PIECE): return (None, 100000000000000)
+                elif board.winning_move(PLAYER_PIECE): return (None, -10000000000000)
+                else: return (None, 0)
+            return (None, self.score_position(board, AI_PIECE))
+        value = -math.inf if maximizingPlayer else math.inf
+        column = random.choice(valid_locations)
+        for col in valid_locations:
+            temp_board = copy.deepcopy(board)
+            temp_board.drop_piece(temp_board.get_next_open_row(col), col, AI_PIECE if maximizingPlayer else PLAYER_PIECE)
+            new_score = self.minimax(temp_board, depth-1, alpha, beta, not maximizingPlayer)[1]
+            if maximizingPlayer and new_score > value or not maximizingPlayer and new_score < value:
+                value = new_score
+                column = col
+            if maximizingPlayer: alpha = max(alpha, value)
+            else: beta = min(beta, value)
+            if alpha >= beta: break
+        return column, value
+
+def random_leaves(count, seed=1):
+    # Boards part way through random games, nobody having four yet
+    rng = random.Random(seed)
+    leaves = []
+    while len(leaves) < count:
+        board, bits = CountingBoard(), BitBoard()
+        piece = PLAYER_PIECE
+        for _ in range(rng.randint(4, 30)):
+            col = rng.choice([c for c in range(COLUMN_COUNT) if bits.can_play(c)])
+            bits.play(col)
+            if bits.last_mover_won(): break
+            board.drop_piece(board.get_next_open_row(col), col, piece)
+            piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+        else:
+            leaves.append(board)
+    return leaves
+
+def time_scorers(count):
+    leaves = random_leaves(count)
+    grid_ai = GridAI()
+    ai_bits = [sum(1 << (c * (ROW_COUNT + 1) + r) for r in range(ROW_COUNT) for c in range(COLUMN_COUNT)
+                   if board.grid[r][c] == piece) for board in leaves for piece in (AI_PIECE, PLAYER_PIECE)]
+
+    def counters():
+        scores = []
+        for board in leaves:
+            row, col, piece = board.history[-1]
+            board.take_back()
+            board.drop_piece(row, col, piece)
+            scores.append(board.score(AI_PIECE))
+        return scores
+
+    scorers = [
+        ('windows', lambda: [grid_ai.score_position(board, AI_PIECE) for board in leaves]),
+        ('counters', counters),
+        ('bitboard', lambda: [CLASSIC.score_bits(ai_bits[i], ai_bits[i + 1]) for i in range(0, len(ai_bits), 2)]),
+    ]
+    if np is not None:
+        scorers.append(('numpy batch', lambda: list(score_batch([board.grid for board in leaves], AI_PIECE))))
+
+    print(f"\n{'scorer':<12}{'leaves':>8}{'us/leaf':>10}")
+    expected = None
+    for label, run in scorers:
+        start = time.perf_counter()
+        scores = run()
+        elapsed = time.perf_counter() - start
+        if expected is None: expected = scores
+        elif scores != expected: raise AssertionError(f"{label} scores differ from the window scorer")
+        print(f"{label:<12}{len(leaves):>8}{elapsed / len(leaves) * 1e6:>10.2f}")
+
+def time_search(variant, depth, repeat):
+    # Nodes and best seconds for a fixed-depth search from the player's first stone in the
+    # center column
+    moves = [variant.columns // 2]
+    elapsed = math.inf
+    for _ in range(repeat):
+        ai = AI(variant=variant)
+        start = time.perf_counter()
+        ai.get_move(board_from_moves(moves, variant=variant), None, depth)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return ai.nodes, elapsed
+
+def time_variants(specs, depth, budget, repeat):
+    # Each variant's nodes per second next to classic Connect Four's, and its depth in budget
+    classic = time_search(CLASSIC, depth, repeat)
+    classic_rate = classic[0] / classic[1]
+    print(f"\n{'variant':<16}{'lines':>6}{'depth':>6}{'nodes':>10}{'seconds':>10}{'nodes/s':>10}{'vs 7x6':>8}"
+          f"  {'in':>5} {'depth':>5}")
+    for spec in specs:
+        size, connect = spec.split(':')
+        columns, rows = map(int, size.split('x'))
+        variant = Variant(rows, columns, int(connect))
+        classic_size = (rows, columns, variant.connect) == (ROW_COUNT, COLUMN_COUNT, WINDOW_LENGTH)
+        nodes, elapsed = classic if classic_size else time_search(variant, depth, repeat)
+        ai = AI(variant=variant)
+        ai.get_move(board_from_moves([columns // 2], variant=variant), budget)
+        print(f"{str(variant):<16}{len(grid_lines(variant)):>6}{depth:>6}{nodes:>10}{elapsed:>10.3f}{nodes / elapsed:>10.0f}"
+              f"{nodes / elapsed / classic_rate:>7.2f}x  {budget:>4.1f}s {ai.depth:>5}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depths', type=int, nargs='+', default=[4, 5, 6, 7])
+    parser.add_argument('--baseline-max', type=int, default=5, help="deepest grid search run (it is slow)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds per move for the depth-reached table")
+    parser.add_argument('--leaves', type=int, default=2000, help="random positions for the scorer table")
+    parser.add_argument('--variants', nargs='+', default=['7x6:4', '8x7:4', '9x7:5', '10x8:5'],
+                        help="columns x rows : line length")
+    parser.add_argument('--variant-depth', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'position':<10}{'depth':>6}  {'search':<10}{'column':>7}{'nodes':>10}{'seconds':>10}{'nodes/s':>10}{'speedup':>9}")
+    for name, moves in POSITIONS.items():
+        for depth in args.depths:
+            runs = [('bitboard', AI, lambda ai: ai.get_move(board_from_moves(moves), None, depth))]
+            if depth <= args.baseline_max:
+                runs.insert(0, ('grid', GridAI, lambda ai: ai.minimax(board_from_moves(moves, GridBoard), depth, -math.inf, math.inf, True)))
+            baseline = None
+            for label, make_ai, run in runs:
+                elapsed = math.inf
+                for _ in range(args.repeat):
+                    ai = make_ai()
+                    start = time.perf_counter()
+                    column, _ = run(ai)
+                    elapsed = min(elapsed, time.perf_counter() - start)
+                if label == 'grid': baseline = elapsed
+                speedup = f"{baseline / elapsed:>8.1f}x" if baseline else ""
+                print(f"{name:<10}{depth:>6}  {label:<10}{column:>7}{ai.nodes:>10}{elapsed:>10.3f}{ai.nodes / elapsed:>10.0f}{speedup:>9}")
+                sys.stdout.flush()
+
+    print(f"\n{'position':<10}{'budget':>7}  {'depth':>6}{'column':>7}{'nodes':>10}")
+    for name, moves in POSITIONS.items():
+        ai = AI()
+        column, _ = ai.get_move(board_from_moves(moves), args.budget)
+        print(f"{name:<10}{args.budget:>6.1f}s  {ai.depth:>6}{column:>7}{ai.nodes:>10}")
+
+    print(f"\n{'position':<10}{'stones':>7}{'score':>7}{'column':>7}{'nodes':>10}{'seconds':>10}")
+    for name, moves in ENDGAMES.items():
+        board = BitBoard()
+        for col in moves: board.play(col)
+        solver = Solver()
+        start = time.perf_counter()
+        column, score = solver.best_move(board)
+        print(f"{name:<10}{board.moves:>7}{score:>7}{column:>7}{solver.nodes:>10}{time.perf_counter() - start:>10.3f}")
+
+    time_scorers(args.leaves)
+    time_variants(args.variants, args.variant_depth, args.budget, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Generate the Connect Four opening table.
+
+Every position the AI can meet in its first moves, whichever side starts, is
+searched to a fixed depth and the column it picks is stored with its score.
+All of the player's replies are followed; the AI's own moves are the ones
+just stored, so the table covers exactly the games the AI can play. A
+position and its mirror image share one record.
+
+    python3 build_openings.py [openings.bin] [--plies 6] [--depth 14]
+
+Openings are far too deep to solve exactly in Python (the solver in
+connectfour.py takes over from SOLVER_MIN_MOVES stones), so the scores are the
+search's own evaluation rather than game-theoretic values. Rebuild the table
+whenever the evaluation changes.
+"""
+import os
+import sys
+import time
+import argparse
+from collections import deque
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from connectfour import (AI, Board, BitBoard, COLUMN_COUNT, AI_PIECE, PLAYER_PIECE, BOOK_FILE,
+                         BOOK_MAGIC, BOOK_RECORD, BOOK_SCORE_LIMIT)
+
+def grid_board(columns):
+    # The GUI board after the given moves, with the AI to move
+    board = Board()
+    for i, col in enumerate(columns):
+        piece = AI_PIECE if (len(columns) - i) % 2 == 0 else PLAYER_PIECE
+        board.drop_piece(board.get_next_open_row(col), col, piece)
+    return board
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', nargs='?', default=BOOK_FILE)
+    parser.add_argument('--plies', type=int, default=6, help="store positions with fewer stones than this")
+    parser.add_argument('--depth', type=int, default=14)
+    args = parser.parse_args()
+
+    ai = AI()
+    records = {}
+    # The empty board when the AI starts, each first move of the player's otherwise
+    queue = deque([[]] + [[col] for col in range(COLUMN_COUNT)])
+    start = time.perf_counter()
+    while queue:
+        columns = queue.popleft()
+        board = BitBoard()
+        for col in columns: board.play(col)
+        key, mirrored = board.book_key()
+        if key in records: continue   # The mirror image was already searched and expanded
+        column, value = ai.get_move(grid_board(columns), None, args.depth)
+        score = max(-BOOK_SCORE_LIMIT, min(BOOK_SCORE_LIMIT, value))
+        records[key] = (score, COLUMN_COUNT - 1 - column if mirrored else column)
+        print(f"{''.join(str(c + 1) for c in columns) or '-':<8} column {column + 1}  score {score:>6}"
+              f"  {ai.nodes:>9} nodes  {time.perf_counter() - start:7.1f}s")
+        sys.stdout.flush()
+
+        board.play(column)
+        if board.last_mover_won() or len(columns) + 2 >= args.plies: continue
+        for reply in range(COLUMN_COUNT):
+            if not board.can_play(reply): continue
+            board.play(reply)
+            if not board.last_mover_won() and not board.is_full(): queue.append(columns + [column, reply])
+            board.undo(reply)
+
+    with open(args.output, 'wb') as f:
+        f.write(BOOK_MAGIC)
+        for key in sorted(records):
+            f.write(BOOK_RECORD.pack(key, *records[key]))
+    print(f"wrote {len(records)} positions to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 import pygame
+import os
 import sys
+import time
+import struct
 import random
 import math
 
@@ -9,9 +12,6 @@ ROW_COUNT = 6
 SQUARE_SIZE = 100
 RADIUS = int(SQUARE_SIZE / 2 - 5)
 
-WIDTH = COLUMN_COUNT * SQUARE_SIZE
-HEIGHT = (ROW_COUNT + 1) * SQUARE_SIZE # Extra row for header
-
 # COLORS
 BLUE = (0, 0, 255)
 BLACK = (20, 20, 30)
@@ -28,6 +28,14 @@ PLAYER_PIECE = 1
 AI_PIECE = 2
 WINDOW_LENGTH = 4
 
+# AI
+AI_TIME_LIMIT = 1.0        # Seconds of thinking per move
+TT_MAX_ENTRIES = 1 << 20   # The search caches are cleared when they grow past this
+WIN_SCORE = 100000000000000     # AI has four; a win sooner scores a little higher
+LOSS_SCORE = -10000000000000    # Player has four; a loss later scores a little higher
+SOLVER_MIN_MOVES = 16      # From this many stones on 7x6, try to solve the position exactly first
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openings.bin")
+
 # --- PIXEL FONT ENGINE (No System Dependencies) ---
 PIXEL_FONT = {
     'A': [0x70, 0x88, 0x88, 0xF8, 0x88, 0x88, 0x88],
@@ -82,9 +90,293 @@ def draw_text(surface, text, x, y, scale=3, color=WHITE, center=False):
         cursor_x += 6 * scale
 
 # --- GAME LOGIC ---
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (-1, 1)]   # (row, col) steps
+
+def _line_value(own, opp, connect):
+    # What a line of `connect` cells holding `own` stones of one side and `opp` of the other
+    # is worth to the first side: a win, an open three or two (for four in a row), or the
+    # other side's open three against it. Lines both sides have a stone in are worth nothing.
+    if own == connect: return 100
+    if own and not opp: return 5 if own == connect - 1 else 2 if own == connect - 2 else 0
+    return -4 if not own and opp == connect - 1 else 0
+
+class Variant:
+    # One board size and line length, with everything the engine needs precomputed for it:
+    # the line values, the bitboard masks and shifts, and has_line,
+    # winning_cells and score_bits over them. Four and five in a row have hand-written
+    # versions, the fastest; other line lengths loop over the variant's shift tables.
+    def __init__(self, rows=ROW_COUNT, columns=COLUMN_COUNT, connect=WINDOW_LENGTH):
+        if not 2 <= connect <= max(rows, columns):
+            raise ValueError(f"cannot connect {connect} on a {columns}x{rows} board")
+        self.rows, self.columns, self.connect = rows, columns, connect
+        self.cell_count = rows * columns
+
+        # line_values[own][opp] from _line_value
+        self.line_values = [[_line_value(own, opp, connect) for opp in range(connect + 1)] for own in range(connect + 1)]
+        self.center = columns // 2
+
+        # Column-major bits, one column of `rows` cells plus a spare bit on top so that shifts
+        # never carry a line from one column into the next: bit = col * (rows + 1) + row.
+        # A line is the same bit pattern shifted by 1 (vertical), h1 (horizontal), h1 + 1
+        # (rising diagonal) or h1 - 1 (falling diagonal).
+        h1 = self.h1 = rows + 1
+        column_bits = (1 << rows) - 1
+        self.bottom_mask = sum(1 << (c * h1) for c in range(columns))
+        self.board_mask = self.bottom_mask * column_bits
+        self.center_mask = column_bits << (self.center * h1)
+        self.column_order = sorted(range(columns), key=lambda c: abs(2 * c - (columns - 1)))   # Center out
+        self.column_tops = [c * h1 + rows for c in range(columns)]   # First bit above each column
+        self.column_masks = [column_bits << (c * h1) for c in range(columns)]
+        self.shifts = [dc * h1 + dr for dr, dc in DIRECTIONS]   # Between neighbouring cells of a line
+
+        # score_bits looks at all four directions in one go: multiplying a board by spread[j]
+        # lays out one lane per direction, lane k holding the board moved j cells back along
+        # direction k, so bit i of every lane sees cell i + j*shift. line_base leaves room for
+        # the largest move and line_lane keeps lanes from overlapping. line_starts marks, in
+        # each lane, the cells a whole line can start from.
+        line_base = (connect - 1) * max(self.shifts)
+        line_lane = h1 * columns + line_base
+        self.spread = [sum(1 << (k * line_lane + line_base - j * s) for k, s in enumerate(self.shifts))
+                       for j in range(connect)]
+        self.line_starts = sum(self._line_starts(dr, dc) << (k * line_lane + line_base)
+                               for k, (dr, dc) in enumerate(DIRECTIONS))
+
+        # has_line ANDs a board with itself shifted along a line until only stones that start
+        # a whole line are left: runs of 2, then 4, 8..., topped up to `connect`. These are the
+        # shifts per direction.
+        steps, length = [], 1
+        while length * 2 <= connect:
+            steps.append(length)
+            length *= 2
+        if length < connect: steps.append(connect - length)
+        self.run_shifts = [[step * s for step in steps] for s in self.shifts]
+        # winning_cells looks up to connect - 1 cells either way along each direction
+        self.cell_shifts = [[k * s for k in range(1, connect)] for s in self.shifts]
+        # score_bits: the counts of a line's stones that are worth something, with their values
+        self.own_scoring = [(count, self.line_values[count][0]) for count in range(1, connect)
+                            if self.line_values[count][0]]
+        self.opp_scoring = [(count, self.line_values[0][count]) for count in range(1, connect)
+                            if self.line_values[0][count]]
+
+        if connect == 4: self.has_line, self.winning_cells, self.score_bits = self._four_in_a_row()
+        elif connect == 5: self.has_line, self.winning_cells, self.score_bits = self._five_in_a_row()
+        else: self.has_line, self.winning_cells, self.score_bits = self._any_length()
+
+    def __repr__(self):
+        return f"{self.columns}x{self.rows} connect {self.connect}"
+
+    def _line_starts(self, dr, dc):
+        # Cells a whole line can start from in one direction
+        starts = 0
+        for c in range(self.columns):
+            for r in range(self.rows):
+                end_r, end_c = r + dr * (self.connect - 1), c + dc * (self.connect - 1)
+                if 0 <= end_r < self.rows and end_c < self.columns: starts |= 1 << (c * self.h1 + r)
+        return starts
+
+    def _four_in_a_row(self):
+        # has_line, winning_cells and score_bits written out for lines of four
+        board_mask, center_mask, line_starts = self.board_mask, self.center_mask, self.line_starts
+        s0, s1, s2, s3 = self.spread
+        # One, two and three cells along each direction but the vertical (a one-bit shift):
+        # horizontal, rising and falling diagonal
+        (h1, h2, h3), (r1, r2, r3), (f1, f2, f3) = self.cell_shifts[1:]
+
+        def has_line(bits):
+            # Four shift-and tests: does this set of stones contain a line of four?
+            pairs = bits & (bits >> 1)
+            if pairs & (pairs >> 2): return True
+            pairs = bits & (bits >> h1)
+            if pairs & (pairs >> h2): return True
+            pairs = bits & (bits >> r1)
+            if pairs & (pairs >> r2): return True
+            pairs = bits & (bits >> f1)
+            return bool(pairs & (pairs >> f2))
+
+        def winning_cells(stones, mask):
+            # Empty cells that would give `stones` a line of four: three stones below, or along
+            # each other direction three on one side or two on one side and one on the other
+            cells = (stones << 1) & (stones << 2) & (stones << 3)
+            pair = (stones << h1) & (stones << h2)
+            cells |= pair & ((stones << h3) | (stones >> h1))
+            pair = (stones >> h1) & (stones >> h2)
+            cells |= pair & ((stones << h1) | (stones >> h3))
+            pair = (stones << r1) & (stones << r2)
+            cells |= pair & ((stones << r3) | (stones >> r1))
+            pair = (stones >> r1) & (stones >> r2)
+            cells |= pair & ((stones << r1) | (stones >> r3))
+            pair = (stones << f1) & (stones << f2)
+            cells |= pair & ((stones << f3) | (stones >> f1))
+            pair = (stones >> f1) & (stones >> f2)
+            cells |= pair & ((stones << f1) | (stones >> f3))
+            return cells & (board_mask ^ mask)
+
+        def score_bits(own, opp):
+            # The window-by-window score_position (GridAI in bench.py) on bitboards, for every
+            # line at once. The four stones of each line are added bit-sliced (ones and twos bits
+            # of the count); a line counts for a side only if the other side has no stone in it.
+            # No line is ever full: the game would be over.
+            a, b, c, d = own * s0, own * s1, own * s2, own * s3
+            e, f, g, h = opp * s0, opp * s1, opp * s2, opp * s3
+            score = (own & center_mask).bit_count() * 3
+            lines = line_starts & ~(e | f | g | h)
+            if lines:
+                odd, even = a ^ b, c ^ d
+                ones = odd ^ even
+                twos = (a & b) ^ (c & d) ^ (odd & even)
+                score += 5 * (lines & ones & twos).bit_count() + 2 * (lines & twos & ~ones).bit_count()
+            lines = line_starts & ~(a | b | c | d)
+            if lines:
+                odd, even = e ^ f, g ^ h
+                score -= 4 * (lines & (odd ^ even) & ((e & f) ^ (g & h) ^ (odd & even))).bit_count()
+            return score
+
+        return has_line, winning_cells, score_bits
+
+    def _five_in_a_row(self):
+        # has_line, winning_cells and score_bits written out for lines of five
+        board_mask, center_mask, line_starts = self.board_mask, self.center_mask, self.line_starts
+        s0, s1, s2, s3, s4 = self.spread
+        (h1, h2, h3, h4), (r1, r2, r3, r4), (f1, f2, f3, f4) = self.cell_shifts[1:]
+
+        def has_line(bits):
+            # Runs of two, then four, then five along each direction
+            pairs = bits & (bits >> 1)
+            fours = pairs & (pairs >> 2)
+            if fours & (fours >> 1): return True
+            pairs = bits & (bits >> h1)
+            fours = pairs & (pairs >> h2)
+            if fours & (fours >> h1): return True
+            pairs = bits & (bits >> r1)
+            fours = pairs & (pairs >> r2)
+            if fours & (fours >> r1): return True
+            pairs = bits & (bits >> f1)
+            fours = pairs & (pairs >> f2)
+            return bool(fours & (fours >> f1))
+
+        def winning_cells(stones, mask):
+            # Empty cells that would give `stones` a line of five: four stones below, or along
+            # each other direction four on one side, three and one, or two and two
+            cells = (stones << 1) & (stones << 2) & (stones << 3) & (stones << 4)
+            before, after = stones << h1, stones >> h1
+            pair, other = before & (stones << h2), after & (stones >> h2)
+            cells |= (pair & (stones << h3) & ((stones << h4) | after)) | (pair & other)
+            cells |= other & (stones >> h3) & ((stones >> h4) | before)
+            before, after = stones << r1, stones >> r1
+            pair, other = before & (stones << r2), after & (stones >> r2)
+            cells |= (pair & (stones << r3) & ((stones << r4) | after)) | (pair & other)
+            cells |= other & (stones >> r3) & ((stones >> r4) | before)
+            before, after = stones << f1, stones >> f1
+            pair, other = before & (stones << f2), after & (stones >> f2)
+            cells |= (pair & (stones << f3) & ((stones << f4) | after)) | (pair & other)
+            cells |= other & (stones >> f3) & ((stones >> f4) | before)
+            return cells & (board_mask ^ mask)
+
+        def score_bits(own, opp):
+            # As in _four_in_a_row, with five stones per line added into ones, twos and fours
+            # bits: three in a full adder, two in a half adder, and their carries together.
+            # A line of four has the fours bit without the ones bit (five would have both).
+            a, b, c, d, e = own * s0, own * s1, own * s2, own * s3, own * s4
+            f, g, h, i, j = opp * s0, opp * s1, opp * s2, opp * s3, opp * s4
+            score = (own & center_mask).bit_count() * 3
+            lines = line_starts & ~(f | g | h | i | j)
+            if lines:
+                x, y = a ^ b, d ^ e
+                ones = x ^ c
+                abc, de, both = (a & b) | (x & c), d & e, ones & y   # The carries into twos
+                ones ^= y
+                twos = abc ^ de ^ both
+                fours = (abc & de) | (both & (abc ^ de))
+                score += 5 * (lines & fours & ~ones).bit_count() + 2 * (lines & ones & twos).bit_count()
+            lines = line_starts & ~(a | b | c | d | e)
+            if lines:
+                x, y = f ^ g, i ^ j
+                ones = x ^ h
+                fgh, ij, both = (f & g) | (x & h), i & j, ones & y
+                fours = (fgh & ij) | (both & (fgh ^ ij))
+                score -= 4 * (lines & fours & ~(ones ^ y)).bit_count()
+            return score
+
+        return has_line, winning_cells, score_bits
+
+    def _any_length(self):
+        # has_line, winning_cells and score_bits for any line length, looping over the tables
+        run_shifts, vertical, cell_shifts = self.run_shifts, self.cell_shifts[0], self.cell_shifts[1:]
+        board_mask, center_mask, line_starts, spread = self.board_mask, self.center_mask, self.line_starts, self.spread
+        n = self.connect - 1
+        width = self.connect.bit_length()   # Bits of a line's stone count
+
+        def with_bits(scoring):
+            # Each scoring count's value with the count's bits, lowest first
+            return [(value, [count >> k & 1 for k in range(width)]) for count, value in scoring]
+        own_scoring, opp_scoring = with_bits(self.own_scoring), with_bits(self.opp_scoring)
+
+        def has_line(bits):
+            for shifts in run_shifts:
+                run = bits
+                for shift in shifts:
+                    run &= run >> shift
+                    if not run: break
+                else: return True
+            return False
+
+        def winning_cells(stones, mask):
+            # Vertically the cell above n stones; along the other directions a cell with k
+            # stones before it (left[k]) and n - k after it (right[n - k])
+            cells = board_mask
+            for shift in vertical: cells &= stones << shift
+            for shifts in cell_shifts:
+                left, right = [-1], [-1]
+                for shift in shifts:
+                    before, after = left[-1] & (stones << shift), right[-1] & (stones >> shift)
+                    if not (before or after): break
+                    left.append(before)
+                    right.append(after)
+                for k in range(n + 1 - len(right), len(left)): cells |= left[k] & right[n - k]
+            return cells & (board_mask ^ mask)
+
+        def score_bits(own, opp):
+            # GridAI.score_position on bitboards, for every line at once (see _four_in_a_row). The
+            # stones of each line are added bit-sliced, count[k] holding bit k of every lane's
+            # count, and the lines with each count that scores are counted.
+            own_lanes = [own * m for m in spread]
+            opp_lanes = [opp * m for m in spread]
+            score = (own & center_mask).bit_count() * 3
+            for lanes, others, scoring in ((own_lanes, opp_lanes, own_scoring),
+                                           (opp_lanes, own_lanes, opp_scoring)):
+                if not scoring: continue
+                blocked = 0
+                for lane in others: blocked |= lane
+                lines = line_starts & ~blocked
+                if not lines: continue
+                count = []
+                for carry in lanes:
+                    for k, bit in enumerate(count):
+                        count[k] = bit ^ carry
+                        carry &= bit
+                    if carry: count.append(carry)
+                count += [0] * (width - len(count))
+                for value, pattern in scoring:
+                    matches = lines
+                    for bit, one in zip(count, pattern): matches &= bit if one else ~bit
+                    score += value * matches.bit_count()
+            return score
+
+        return has_line, winning_cells, score_bits
+
+    def mirror(self, bits):
+        # The same cells with the columns reversed
+        flipped = 0
+        for c in range(self.columns):
+            flipped |= (bits >> (c * self.h1) & self.column_masks[0]) << ((self.columns - 1 - c) * self.h1)
+        return flipped
+
+CLASSIC = Variant()   # 7 columns, 6 rows, four in a row
+
 class Board:
-    def __init__(self):
-        self.grid = [[EMPTY for _ in range(COLUMN_COUNT)] for _ in range(ROW_COUNT)]
+    def __init__(self, variant=CLASSIC):
+        self.variant = variant
+        self.grid = [[EMPTY for _ in range(variant.columns)] for _ in range(variant.rows)]
         self.game_over = False
         self.winner = None
         self.turn = random.choice([PLAYER, AI])
@@ -93,146 +385,395 @@ class Board:
         self.grid[row][col] = piece
 
     def is_valid_location(self, col):
-        return self.grid[ROW_COUNT-1][col] == EMPTY
+        return self.grid[self.variant.rows-1][col] == EMPTY
 
     def get_next_open_row(self, col):
-        for r in range(ROW_COUNT):
+        for r in range(self.variant.rows):
             if self.grid[r][col] == EMPTY:
                 return r
         return None
 
     def winning_move(self, piece):
-        # Horizontal
-        for c in range(COLUMN_COUNT-3):
-            for r in range(ROW_COUNT):
-                if self.grid[r][c] == piece and self.grid[r][c+1] == piece and self.grid[r][c+2] == piece and self.grid[r][c+3] == piece:
-                    return True
-        # Vertical
-        for c in range(COLUMN_COUNT):
-            for r in range(ROW_COUNT-3):
-                if self.grid[r][c] == piece and self.grid[r+1][c] == piece and self.grid[r+2][c] == piece and self.grid[r+3][c] == piece:
-                    return True
-        # Pos Diag
-        for c in range(COLUMN_COUNT-3):
-            for r in range(ROW_COUNT-3):
-                if self.grid[r][c] == piece and self.grid[r+1][c+1] == piece and self.grid[r+2][c+2] == piece and self.grid[r+3][c+3] == piece:
-                    return True
-        # Neg Diag
-        for c in range(COLUMN_COUNT-3):
-            for r in range(3, ROW_COUNT):
-                if self.grid[r][c] == piece and self.grid[r-1][c+1] == piece and self.grid[r-2][c+2] == piece and self.grid[r-3][c+3] == piece:
-                    return True
-        return False
+        # A line full of `piece`: its stones through the variant's bitboard line test
+        return self.variant.has_line(BitBoard.from_board(self, piece).position)
+
+# --- BITBOARD ENGINE ---
+class BitBoard:
+    # position: stones of the side to move; mask: every stone; heights: next free bit per
+    # column. The bit layout and tables are the variant's.
+    __slots__ = ('variant', 'position', 'mask', 'heights', 'moves')
+
+    def __init__(self, variant=CLASSIC):
+        self.variant = variant
+        self.position = self.mask = self.moves = 0
+        self.heights = [c * variant.h1 for c in range(variant.columns)]
+
+    @classmethod
+    def from_board(cls, board, piece):
+        # The GUI grid, with `piece` to move
+        variant = board.variant
+        bb = cls(variant)
+        for c in range(variant.columns):
+            for r in range(variant.rows):
+                cell = board.grid[r][c]
+                if cell == EMPTY: break
+                bit = 1 << (c * variant.h1 + r)
+                bb.mask |= bit
+                if cell == piece: bb.position |= bit
+                bb.heights[c] += 1
+                bb.moves += 1
+        return bb
+
+    def can_play(self, col):
+        return self.heights[col] < self.variant.column_tops[col]
+
+    def play(self, col):
+        self.position ^= self.mask
+        self.mask |= 1 << self.heights[col]
+        self.heights[col] += 1
+        self.moves += 1
+
+    def undo(self, col):
+        self.heights[col] -= 1
+        self.mask ^= 1 << self.heights[col]
+        self.position ^= self.mask
+        self.moves -= 1
+
+    def last_mover_won(self):
+        return self.variant.has_line(self.position ^ self.mask)
+
+    def is_full(self):
+        return self.moves == self.variant.cell_count
+
+    def book_key(self):
+        # position + mask of this board or its mirror image, whichever is smaller, and
+        # whether it was the mirror: a position and its mirror share one book entry
+        key = self.position + self.mask
+        mirrored = self.variant.mirror(self.position) + self.variant.mirror(self.mask)
+        return (mirrored, True) if mirrored < key else (key, False)
 
 # --- AI ---
-class AI:
-    def evaluate_window(self, window, piece):
-        score = 0
-        opp_piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+class SearchTimeout(Exception): pass
+
+# Transposition table bounds
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class Solver:
+    # Perfect play: negamax with alpha-beta on bare bitboard ints, narrowed to a null window
+    # around a guess until the exact score is known. A score is positive when the side to
+    # move wins, (cells + 1 - stones before its winning move) // 2, so a quicker win scores
+    # more; negative when it loses, 0 for a draw.
+    def __init__(self, variant=CLASSIC):
+        self.variant = variant
+        self.nodes = 0
+        self.deadline = None
+        self.tt = {}   # position + mask -> score << 1 | 1 for a lower bound, 0 for an upper one
+
+    def best_move(self, board):
+        # (column, score) for the side to move on a BitBoard; raises SearchTimeout once
+        # self.deadline is passed
+        v = self.variant
+        position, mask, moves = board.position, board.mask, board.moves
+        if len(self.tt) > TT_MAX_ENTRIES: self.tt.clear()
+        possible = (mask + v.bottom_mask) & v.board_mask
+        wins = v.winning_cells(position, mask) & possible
+        best = None
+        for col in v.column_order:
+            move = possible & v.column_masks[col]
+            if not move: continue
+            if move & wins: return col, (v.cell_count + 1 - moves) // 2
+            if moves + 1 == v.cell_count: score = 0
+            else: score = -self.solve(position ^ mask, mask | move, moves + 1)
+            if best is None or score > best[1]: best = (col, score)
+        return best
+
+    def solve(self, position, mask, moves):
+        # Exact score of a position that is not yet won or drawn
+        v = self.variant
+        cells = v.cell_count
+        if v.winning_cells(position, mask) & (mask + v.bottom_mask) & v.board_mask:
+            return (cells + 1 - moves) // 2
+        low, high = -((cells - moves) // 2), (cells + 1 - moves) // 2
+        while low < high:
+            # Null-window probes, leaning towards 0 first since most positions are close
+            guess = low + (high - low) // 2
+            if guess <= 0 and -(-low // 2) < guess: guess = -(-low // 2)
+            elif guess >= 0 and high // 2 > guess: guess = high // 2
+            score = self.negamax(position, mask, moves, guess, guess + 1)
+            if score <= guess: high = score
+            else: low = score
+        return low
+
+    def negamax(self, position, mask, moves, alpha, beta):
+        # The side to move (`position`) has no winning move here; every move that would hand
+        # the opponent a win right away is left out
+        self.nodes += 1
+        if not self.nodes & 1023 and self.deadline and time.perf_counter() > self.deadline: raise SearchTimeout
+        v = self.variant
+        cells, winning_cells = v.cell_count, v.winning_cells
+        opp = position ^ mask
+        possible = (mask + v.bottom_mask) & v.board_mask
+        threats = winning_cells(opp, mask)
+        forced = possible & threats
+        if forced:
+            if forced & (forced - 1): return -((cells - moves) // 2)   # Two threats to block
+            possible = forced
+        playable = possible & ~(threats >> 1)   # Not under an opponent's winning cell
+        if not playable: return -((cells - moves) // 2)
+        if moves >= cells - 2: return 0
+
+        low = -((cells - 2 - moves) // 2)   # The opponent cannot win with its next stone
+        if alpha < low:
+            alpha = low
+            if alpha >= beta: return alpha
+        high = (cells - 1 - moves) // 2    # Nor can we with this one
+        key = position + mask
+        entry = self.tt.get(key)
+        if entry is not None:
+            if entry & 1:
+                if alpha < entry >> 1:
+                    alpha = entry >> 1
+                    if alpha >= beta: return alpha
+            elif entry >> 1 < high: high = entry >> 1
+        if beta > high:
+            beta = high
+            if alpha >= beta: return beta
+
+        # Moves that make the most new threats first, center out among equals
+        children = []
+        column_masks = v.column_masks
+        for col in v.column_order:
+            move = playable & column_masks[col]
+            if move: children.append((winning_cells(position | move, mask | move).bit_count(), move))
+        children.sort(key=lambda child: child[0], reverse=True)
+        for _, move in children:
+            score = -self.negamax(opp, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                self.tt[key] = score << 1 | 1
+                return score
+            if score > alpha: alpha = score
+        self.tt[key] = alpha << 1
+        return alpha
+
+# openings.bin holds the AI's own picks, not solved values: build_openings.py searched each
+# position of fewer than 6 stones 14 plies deep and kept the column chosen, with the search's
+# score clamped to 16 bits. After "C4BOOK01" come (key, score, column) records, one per pair
+# of mirror-image positions (BitBoard.book_key); a key only fits 64 bits on 7x6.
+BOOK_MAGIC = b"C4BOOK01"
+BOOK_RECORD = struct.Struct(">QhB")
+BOOK_SCORE_LIMIT = 32767
+
+class OpeningBook:
+    # openings.bin read into a dict: the table is a few hundred records
+    def __init__(self, path):
+        with open(path, 'rb') as f: data = f.read()
+        if not data.startswith(BOOK_MAGIC): raise ValueError(f"{path} is not an opening table")
+        self.columns = {key: (column, score) for key, score, column in BOOK_RECORD.iter_unpack(data[len(BOOK_MAGIC):])}
+
+    @classmethod
+    def load(cls, path=BOOK_FILE):
+        return cls(path) if os.path.exists(path) else None
+
+    def lookup(self, board):
+        # (column, score) stored for a BitBoard with the AI to move, or None
+        if board.variant is not CLASSIC: return None
+        key, mirrored = board.book_key()
+        found = self.columns.get(key)
+        if found is None: return None
+        column, score = found
+        return (CLASSIC.columns - 1 - column if mirrored else column), score
 
-        if window.count(piece) == 4: score += 100
-        elif window.count(piece) == 3 and window.count(EMPTY) == 1: score += 5
-        elif window.count(piece) == 2 and window.count(EMPTY) == 2: score += 2
-
-        if window.count(opp_piece) == 3 and window.count(EMPTY) == 1: score -= 4
+class AI:
+    def __init__(self, book=None, variant=CLASSIC):
+        self.variant = variant
+        self.book = book
+        self.solver = Solver(variant)
+        self.solved = False   # Whether the last move came from the exact solver
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = None
+        # Both caches only depend on the position, so they are kept from move to move
+        self.leaf_scores = {}   # (AI stones, player stones) -> score_bits
+        self.tt = {}            # position key -> (depth, value, bound, column)
+
+    def get_move(self, board, time_limit=AI_TIME_LIMIT, max_depth=None):
+        # Entry point from the game: iterative deepening on a BitBoard copy of the grid with
+        # the AI to move. Depth 1, 2, 3... until time_limit seconds are spent (None: no limit),
+        # answering with the deepest search that finished; the first one always does. Each
+        # depth starts from the columns the transposition table says were best last time.
+        # Before that, opening positions are looked up in the book and, once no more cells
+        # are empty than on 7x6 at SOLVER_MIN_MOVES, the solver gets half the time to settle
+        # the game exactly.
+        board = BitBoard.from_board(board, AI_PIECE)
+        self.solved = False
+        self.nodes = 0
+        self.depth = 0
+        if self.book and max_depth is None:
+            found = self.book.lookup(board)
+            if found and board.can_play(found[0]): return found
+        if self.variant.cell_count - board.moves <= CLASSIC.cell_count - SOLVER_MIN_MOVES and max_depth is None:
+            self.solver.nodes = 0
+            self.solver.deadline = None if time_limit is None else time.perf_counter() + time_limit / 2
+            try:
+                column, score = self.solver.best_move(board)
+                self.solved = True
+                return column, self.solver_value(score, board.moves)
+            except SearchTimeout:
+                time_limit /= 2
+            finally:
+                self.nodes = self.solver.nodes
+        cells = self.variant.cell_count
+        if max_depth is None: max_depth = cells - board.moves
+        for cache in (self.tt, self.leaf_scores):
+            if len(cache) > TT_MAX_ENTRIES: cache.clear()
+        self.deadline = None
+        column, value = self.minimax(board, 1, -math.inf, math.inf, True)
+        self.depth = 1
+        if time_limit is not None: self.deadline = time.perf_counter() + time_limit
+        for depth in range(2, max_depth + 1):
+            if value >= WIN_SCORE - cells or value <= LOSS_SCORE + cells: break   # Decided
+            try:
+                column, value = self.minimax(board, depth, -math.inf, math.inf, True)
+            except SearchTimeout:
+                break
+            self.depth = depth
+        self.deadline = None
+        return column, value
+
+    def solver_value(self, score, moves):
+        # A solver score for the AI to move, on the minimax scale: the score and whose turn it
+        # is give the number of stones on the board when the winning one is dropped
+        if score == 0: return 0
+        winner_moves = moves if score > 0 else moves + 1
+        stones = self.variant.cell_count + 1 - 2 * abs(score)
+        stones -= (stones - winner_moves) % 2
+        return WIN_SCORE - stones - 1 if score > 0 else LOSS_SCORE + stones + 1
 
-        return score
+    def minimax(self, board, depth, alpha, beta, maximizingPlayer):
+        # `board` is a BitBoard; each child is played and taken back in place (BitBoard.play
+        # and undo, inlined). A child that wins is scored here without descending into it,
+        # so the position passed in never has a line of four.
+        self.nodes += 1
+        v = self.variant
+        if board.moves == v.cell_count: return (None, 0)
+        if depth == 0:
+            own, opp = board.position, board.position ^ board.mask
+            return (None, self.leaf_score(own, opp) if maximizingPlayer else self.leaf_score(opp, own))
+
+        heights = board.heights
+        tops = v.column_tops
+        valid_locations = [col for col in v.column_order if heights[col] < tops[col]]
+        if depth == 1: return self.frontier(board, valid_locations, alpha, beta, maximizingPlayer)
+        if self.deadline and time.perf_counter() > self.deadline: raise SearchTimeout
+
+        # position + mask identifies the stones; the low bit says whose turn it is
+        key = (board.position + board.mask) << 1 | maximizingPlayer
+        entry = self.tt.get(key)
+        if entry:
+            entry_depth, entry_value, bound, best = entry
+            if entry_depth >= depth and (bound == EXACT or (bound == LOWER and entry_value >= beta)
+                                         or (bound == UPPER and entry_value <= alpha)):
+                return best, entry_value
+            valid_locations.remove(best)
+            valid_locations.insert(0, best)
+        alpha_start, beta_start = alpha, beta
+
+        wins = v.winning_cells(board.position, board.mask)
+        column = None
+        value = -math.inf if maximizingPlayer else math.inf
+        board.moves += 1
+        for col in valid_locations:
+            bit = 1 << heights[col]
+            if bit & wins:
+                self.nodes += 1
+                new_score = WIN_SCORE - board.moves if maximizingPlayer else LOSS_SCORE + board.moves
+            else:
+                heights[col] += 1
+                board.position ^= board.mask
+                board.mask |= bit
+                new_score = self.minimax(board, depth-1, alpha, beta, not maximizingPlayer)[1]
+                board.mask ^= bit
+                board.position ^= board.mask
+                heights[col] -= 1
+            if maximizingPlayer:
+                if new_score > value:
+                    value = new_score
+                    column = col
+                    if value > alpha: alpha = value
+                    if alpha >= beta: break
+            elif new_score < value:
+                value = new_score
+                column = col
+                if value < beta: beta = value
+                if alpha >= beta: break
+        board.moves -= 1
 
-    def score_position(self, board, piece):
-        score = 0
-        grid = board.grid
-        
-        # Center column preference
-        center_array = [i[COLUMN_COUNT//2] for i in grid]
-        center_count = center_array.count(piece)
-        score += center_count * 3
-
-        # Horizontal
-        for r in range(ROW_COUNT):
-            row_array = grid[r]
-            for c in range(COLUMN_COUNT-3):
-                window = row_array[c:c+WINDOW_LENGTH]
-                score += self.evaluate_window(window, piece)
-
-        # Vertical
-        for c in range(COLUMN_COUNT):
-            col_array = [grid[r][c] for r in range(ROW_COUNT)]
-            for r in range(ROW_COUNT-3):
-                window = col_array[r:r+WINDOW_LENGTH]
-                score += self.evaluate_window(window, piece)
-
-        # Positive Diagonal
-        for r in range(ROW_COUNT-3):
-            for c in range(COLUMN_COUNT-3):
-                window = [grid[r+i][c+i] for i in range(WINDOW_LENGTH)]
-                score += self.evaluate_window(window, piece)
-
-        # Negative Diagonal
-        for r in range(ROW_COUNT-3):
-            for c in range(COLUMN_COUNT-3):
-                window = [grid[r+3-i][c+i] for i in range(WINDOW_LENGTH)]
-                score += self.evaluate_window(window, piece)
+        bound = UPPER if value <= alpha_start else LOWER if value >= beta_start else EXACT
+        self.tt[key] = (depth, value, bound, column)
+        return column, value
 
+    def leaf_score(self, ai_bits, player_bits):
+        # Most leaves are reached again through another move order
+        key = (ai_bits, player_bits)
+        score = self.leaf_scores.get(key)
+        if score is None: score = self.leaf_scores[key] = self.variant.score_bits(ai_bits, player_bits)
         return score
 
-    def is_terminal_node(self, board):
-        return board.winning_move(PLAYER_PIECE) or board.winning_move(AI_PIECE) or len(self.get_valid_locations(board)) == 0
-
-    def get_valid_locations(self, board):
-        valid_locations = []
-        for col in range(COLUMN_COUNT):
-            if board.is_valid_location(col):
-                valid_locations.append(col)
-        return valid_locations
-
-    def minimax(self, board, depth, alpha, beta, maximizingPlayer):
-        valid_locations = self.get_valid_locations(board)
-        is_terminal = self.is_terminal_node(board)
-        
-        if depth == 0 or is_terminal:
-            if is_terminal:
-                if board.winning_move(AI_PIECE): return (None, 100000000000000)
-                elif board.winning_move(PLAYER_PIECE): return (None, -10000000000000)
-                else: return (None, 0)
-            else:
-                return (None, self.score_position(board, AI_PIECE))
-
+    def frontier(self, board, valid_locations, alpha, beta, maximizingPlayer):
+        # minimax at depth 1 with the leaves scored in the loop: a child is just the mover's
+        # stones plus one bit, so nothing is played, taken back or called per leaf
+        mover, other = board.position, board.position ^ board.mask
+        v = self.variant
+        wins = v.winning_cells(mover, board.mask)
+        full = board.moves + 1 == v.cell_count
+        score_bits = v.score_bits
+        cache = self.leaf_scores
+        column = None
+        self.nodes += len(valid_locations)   # Taken back below for children cut off
         if maximizingPlayer:
             value = -math.inf
-            column = random.choice(valid_locations)
-            for col in valid_locations:
-                row = board.get_next_open_row(col)
-                temp_board = copy.deepcopy(board)
-                temp_board.drop_piece(row, col, AI_PIECE)
-                new_score = self.minimax(temp_board, depth-1, alpha, beta, False)[1]
+            for i, col in enumerate(valid_locations):
+                bit = 1 << board.heights[col]
+                stones = mover | bit
+                if bit & wins: new_score = WIN_SCORE - board.moves - 1
+                elif full: new_score = 0
+                else:
+                    new_score = cache.get((stones, other))
+                    if new_score is None: new_score = cache[(stones, other)] = score_bits(stones, other)
                 if new_score > value:
                     value = new_score
                     column = col
-                alpha = max(alpha, value)
-                if alpha >= beta: break
-            return column, value
+                    if value > alpha: alpha = value
+                    if alpha >= beta:
+                        self.nodes -= len(valid_locations) - i - 1
+                        break
         else:
             value = math.inf
-            column = random.choice(valid_locations)
-            for col in valid_locations:
-                row = board.get_next_open_row(col)
-                temp_board = copy.deepcopy(board)
-                temp_board.drop_piece(row, col, PLAYER_PIECE)
-                new_score = self.minimax(temp_board, depth-1, alpha, beta, True)[1]
+            for i, col in enumerate(valid_locations):
+                bit = 1 << board.heights[col]
+                stones = mover | bit
+                if bit & wins: new_score = LOSS_SCORE + board.moves + 1
+                elif full: new_score = 0
+                else:
+                    new_score = cache.get((other, stones))
+                    if new_score is None: new_score = cache[(other, stones)] = score_bits(other, stones)
                 if new_score < value:
                     value = new_score
                     column = col
-                beta = min(beta, value)
-                if alpha >= beta: break
-            return column, value
+                    if value < beta: beta = value
+                    if alpha >= beta:
+                        self.nodes -= len(valid_locations) - i - 1
+                        break
+        return column, value
 
 # --- RENDERING ---
 def draw_board(screen, board):
+    rows, columns = board.variant.rows, board.variant.columns
     # Draw Background
-    pygame.draw.rect(screen, BLACK, (0,0, WIDTH, SQUARE_SIZE))
+    pygame.draw.rect(screen, BLACK, (0,0, screen.get_width(), SQUARE_SIZE))
     
-    for c in range(COLUMN_COUNT):
-        for r in range(ROW_COUNT):
+    for c in range(columns):
+        for r in range(rows):
             # Draw Blue Box (The Board structure)
             rect = (c*SQUARE_SIZE, (r+1)*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
             pygame.draw.rect(screen, BLUE, rect)
@@ -249,7 +790,7 @@ def draw_board(screen, board):
             # Visual Row 0 (Top) -> Logic Row 5. Visual Row 5 (Bottom) -> Logic Row 0.
             # Let's actually adjust the draw loop to match logic.
             
-            logic_row = ROW_COUNT - 1 - r
+            logic_row = rows - 1 - r
             piece = board.grid[logic_row][c]
             
             if piece == EMPTY: pygame.draw.circle(screen, BLACK, circle_pos, RADIUS)
@@ -261,25 +802,24 @@ def draw_board(screen, board):
         pos_x = pygame.mouse.get_pos()[0]
         # Snap to column
         col = int(math.floor(pos_x / SQUARE_SIZE))
-        if 0 <= col < COLUMN_COUNT:
+        if 0 <= col < columns:
             cx = int(col * SQUARE_SIZE + SQUARE_SIZE/2)
             pygame.draw.circle(screen, RED, (cx, int(SQUARE_SIZE/2)), RADIUS)
 
 def draw_game_over(screen, winner_text):
-    pygame.draw.rect(screen, BLACK, (0,0, WIDTH, SQUARE_SIZE))
-    draw_text(screen, winner_text, WIDTH//2, 25, 3, center=True)
+    pygame.draw.rect(screen, BLACK, (0,0, screen.get_width(), SQUARE_SIZE))
+    draw_text(screen, winner_text, screen.get_width()//2, 25, 3, center=True)
 
 # --- MAIN ---
-import copy
-
-def main():
+def main(variant=CLASSIC):
     pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Connect Four AI")
+    # One square per cell, plus a row on top for the piece about to drop
+    screen = pygame.display.set_mode((variant.columns * SQUARE_SIZE, (variant.rows + 1) * SQUARE_SIZE))
+    pygame.display.set_caption("Connect Four AI" if variant is CLASSIC else f"Connect {variant.connect} AI")
     clock = pygame.time.Clock()
     
-    board = Board()
-    ai = AI()
+    board = Board(variant)
+    ai = AI(book=OpeningBook.load() if variant is CLASSIC else None, variant=variant)
     
     while True:
         clock.tick(30)
@@ -292,7 +832,7 @@ def main():
             # Simple "Thinking" animation delay
             pygame.time.wait(500)
             
-            col, minimax_score = ai.minimax(board, 5, -math.inf, math.inf, True)
+            col, minimax_score = ai.get_move(board)
             
             if board.is_valid_location(col):
                 row = board.get_next_open_row(col)
@@ -327,10 +867,10 @@ def main():
                             board.winner = "YOU WIN!"
                         
                         board.turn = AI
-            
+
             if event.type == pygame.MOUSEBUTTONDOWN and board.game_over:
                 # Reset on click
-                board = Board()
+                board = Board(variant)
 
         draw_board(screen, board)
         
@@ -340,4 +880,12 @@ def main():
         pygame.display.flip()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python3 connectfour.py [--size 9x7] [--connect 5]: columns x rows, and the line to make
+    import argparse
+    parser = argparse.ArgumentParser(description="Connect Four against the AI")
+    parser.add_argument('--size', default=f"{COLUMN_COUNT}x{ROW_COUNT}")
+    parser.add_argument('--connect', type=int, default=WINDOW_LENGTH)
+    args = parser.parse_args()
+    columns, rows = map(int, args.size.lower().split('x'))
+    main(CLASSIC if (rows, columns, args.connect) == (ROW_COUNT, COLUMN_COUNT, WINDOW_LENGTH)
+         else Variant(rows, columns, args.connect))
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Solve Connect Four positions exactly.
+
+Each position is given as the columns played from the empty board, 1 to 7,
+e.g. 4453. Prints the score for the side to move (positive: it wins, the
+larger the sooner; negative: it loses; 0: a draw) and a best column.
+Other boards (up to 9 columns) are given as --size and --connect.
+
+    python3 solve.py 4453 [more positions...] [--time-limit 60] [--size 7x6] [--connect 4]
+
+Positions with fewer than about SOLVER_MIN_MOVES stones can take a very
+long time; --time-limit gives up on them.
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from connectfour import BitBoard, Solver, Variant, SearchTimeout, CLASSIC, COLUMN_COUNT, ROW_COUNT, WINDOW_LENGTH
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('positions', nargs='+')
+    parser.add_argument('--time-limit', type=float, default=None, help="seconds per position")
+    parser.add_argument('--size', default=f"{COLUMN_COUNT}x{ROW_COUNT}", help="columns x rows")
+    parser.add_argument('--connect', type=int, default=WINDOW_LENGTH)
+    args = parser.parse_args()
+
+    columns, rows = map(int, args.size.lower().split('x'))
+    variant = CLASSIC if (rows, columns, args.connect) == (ROW_COUNT, COLUMN_COUNT, WINDOW_LENGTH) else Variant(rows, columns, args.connect)
+    solver = Solver(variant)
+    for moves in args.positions:
+        board = BitBoard(variant)
+        for ch in moves:
+            col = int(ch) - 1
+            if not 0 <= col < variant.columns or not board.can_play(col): sys.exit(f"{moves}: illegal move {ch}")
+            board.play(col)
+            if board.last_mover_won(): sys.exit(f"{moves}: the game is already won")
+        if board.is_full():
+            print(f"{moves}: draw, the board is full")
+            continue
+        solver.nodes = 0
+        start = time.perf_counter()
+        solver.deadline = None if args.time_limit is None else start + args.time_limit
+        try:
+            column, score = solver.best_move(board)
+        except SearchTimeout:
+            print(f"{moves}: not solved in {args.time_limit}s ({solver.nodes} nodes)")
+            continue
+        print(f"{moves}: score {score:+d}, column {column + 1}  ({solver.nodes} nodes, {time.perf_counter() - start:.2f}s)")
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
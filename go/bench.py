@@ -0,0 +1,144 @@
+"""Milliseconds per legality scan and bytes of position history, flood-fill Go board against GoBoard.
+
+    python3 bench.py [--sizes 9 13 19] [--games 5] [--moves 150] [--seed 1]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from go import GoBoard, EMPTY, B_STONE, W_STONE
+
+class FloodBoard(GoBoard):
+    # The original board: groups and liberties are flood-filled again for every question,
+    # and every position is kept as a full grid to compare new ones against
+
+    def __init__(self, size):
+        super().__init__(size)
+        self.history = []
+        self.save_state()
+
+    def save_state(self):
+        self.history.append([row[:] for row in self.grid])
+
+    def get_group(self, r, c, board=None):
+        if board is None: board = self.grid
+        color = board[r][c]
+        if color == EMPTY: return set()
+        group = set()
+        stack = [(r, c)]
+        while stack:
+            cur_r, cur_c = stack.pop()
+            if (cur_r, cur_c) in group: continue
+            group.add((cur_r, cur_c))
+            for nr, nc in self.neighbors[cur_r][cur_c]:
+                if board[nr][nc] == color: stack.append((nr, nc))
+        return group
+
+    def count_liberties(self, group, board=None):
+        if board is None: board = self.grid
+        liberties = set()
+        for r, c in group:
+            for nr, nc in self.neighbors[r][c]:
+                if board[nr][nc] == EMPTY: liberties.add((nr, nc))
+        return len(liberties)
+
+    def is_valid_move(self, r, c, color):
+        if self.grid[r][c] != EMPTY: return False
+        temp_board = [row[:] for row in self.grid]
+        temp_board[r][c] = color
+        opponent = W_STONE if color == B_STONE else B_STONE
+        for nr, nc in self.neighbors[r][c]:
+            if temp_board[nr][nc] == opponent:
+                grp = self.get_group(nr, nc, temp_board)
+                if self.count_liberties(grp, temp_board) == 0:
+                    for gr, gc in grp: temp_board[gr][gc] = EMPTY
+        if self.count_liberties(self.get_group(r, c, temp_board), temp_board) == 0:
+            return False
+        if temp_board in self.history:
+            return False
+        return True
+
+    def place_stone(self, r, c):
+        if not self.is_valid_move(r, c, self.turn): return False
+        self.grid[r][c] = self.turn
+        opponent = W_STONE if self.turn == B_STONE else B_STONE
+        captured_count = 0
+        for nr, nc in self.neighbors[r][c]:
+            if self.grid[nr][nc] == opponent:
+                grp = self.get_group(nr, nc)
+                if self.count_liberties(grp) == 0:
+                    for gr, gc in grp:
+                        self.grid[gr][gc] = EMPTY
+                        captured_count += 1
+        self.prisoners[self.turn] += captured_count
+        self.last_move = (r, c)
+        self.turn = opponent
+        self.passed = False
+        self.save_state()
+        return True
+
+def legal_points(board):
+    return [(r, c) for r in range(board.size) for c in range(board.size)
+            if board.is_valid_move(r, c, board.turn)]
+
+def grid_bytes(board):
+    return sys.getsizeof(board.history) + sum(sys.getsizeof(grid) + sum(map(sys.getsizeof, grid))
+                                              for grid in board.history)
+
+def hash_bytes(board):
+    return sys.getsizeof(board.seen) + sum(map(sys.getsizeof, board.seen))
+
+def play(size, games, moves, rng):
+    # Both boards play the same random legal moves; returns the seconds each spent on
+    # legality scans, the number of scans and the bytes each kept for past positions
+    timings = {'flood fill': 0.0, 'strings': 0.0}
+    memory = {'flood fill': 0, 'strings': 0}
+    scans = 0
+    for _ in range(games):
+        old, new = FloodBoard(size), GoBoard(size)
+        for _ in range(moves):
+            start = time.perf_counter()
+            expected = legal_points(old)
+            timings['flood fill'] += time.perf_counter() - start
+            start = time.perf_counter()
+            got = legal_points(new)
+            timings['strings'] += time.perf_counter() - start
+            scans += 1
+            if got != expected:
+                raise AssertionError(f"{size}x{size}: legal moves differ after {len(old.history) - 1} moves")
+            if not got:
+                old.pass_turn()
+                new.pass_turn()
+                continue
+            r, c = rng.choice(got)
+            old.place_stone(r, c)
+            new.place_stone(r, c)
+            if old.grid != new.grid or old.prisoners != new.prisoners:
+                raise AssertionError(f"{size}x{size}: boards differ after {r, c}")
+        memory['flood fill'] += grid_bytes(old)
+        memory['strings'] += hash_bytes(new)
+    return timings, scans, {k: v / games for k, v in memory.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[9, 13, 19])
+    parser.add_argument('--games', type=int, default=5)
+    parser.add_argument('--moves', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'board':<8}{'scans':>7}{'flood fill':>14}{'strings':>12}{'speedup':>9}"
+          f"{'grids':>12}{'hashes':>10}")
+    for size in args.sizes:
+        timings, scans, memory = play(size, args.games, args.moves, rng)
+        old, new = (timings[k] / scans * 1000 for k in ('flood fill', 'strings'))
+        print(f"{f'{size}x{size}':<8}{scans:>7}{old:>11.2f} ms{new:>9.2f} ms{old / new:>8.1f}x"
+              f"{memory['flood fill'] / 1024:>9.0f} KB{memory['strings'] / 1024:>7.0f} KB")
+    print("per scan: one legality check on every point of the board; grids/hashes: past positions kept")
+
+if __name__ == "__main__":
+    main()
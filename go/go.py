@@ -76,108 +76,139 @@ def draw_text(surface, text, x, y, scale=2, color=TEXT_COL):
         cursor_x += 6 * scale
 
 # --- GO LOGIC ---
+_NEIGHBORS = {}
+
+def neighbors(size):
+    # For each point of a size x size board, the points next to it (cached per size)
+    if size not in _NEIGHBORS:
+        _NEIGHBORS[size] = [[[(r + dr, c + dc) for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]
+                              if 0 <= r + dr < size and 0 <= c + dc < size]
+                             for c in range(size)] for r in range(size)]
+    return _NEIGHBORS[size]
+
+_ZOBRIST = {}
+
+def zobrist(size):
+    # A random 64-bit key for each colour on each point (fixed seed, cached per size). A
+    # position's hash is the XOR of the keys of its stones, so placing or removing a
+    # stone is one XOR.
+    if size not in _ZOBRIST:
+        rng = random.Random(size)
+        _ZOBRIST[size] = {color: [[rng.getrandbits(64) for _ in range(size)] for _ in range(size)]
+                          for color in (B_STONE, W_STONE)}
+    return _ZOBRIST[size]
+
+class String:
+    # A chain of connected stones of one colour and the empty points next to it. The board
+    # keeps these up to date stone by stone, so no group is ever flood-filled again.
+    __slots__ = ('color', 'stones', 'liberties', 'hash')
+
+    def __init__(self, color, stones, liberties, hash):
+        self.color = color
+        self.stones = stones         # set of (r, c)
+        self.liberties = liberties   # set of (r, c)
+        self.hash = hash             # XOR of its stones' Zobrist keys
+
 class GoBoard:
-    def __init__(self):
-        self.grid = [[EMPTY for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+    def __init__(self, size=GRID_SIZE):
+        self.size = size
+        self.neighbors = neighbors(size)
+        self.zobrist = zobrist(size)
+        self.grid = [[EMPTY for _ in range(size)] for _ in range(size)]
+        self.strings = [[None for _ in range(size)] for _ in range(size)]   # The String on each stone
         self.turn = B_STONE
         self.last_move = None
         self.prisoners = {B_STONE: 0, W_STONE: 0} # Stones captured BY this color
-        self.history = [] # For Ko checking
+        self.hash = 0 # Zobrist hash of the stones on the board
+        self.seen = {self.hash} # Hashes of every position so far, for superko
         self.passed = False
         self.game_over = False
         self.score_res = None
-        self.save_state()
 
-    def save_state(self):
-        # Save a deep copy of grid for Ko checking
-        self.history.append([row[:] for row in self.grid])
-
-    def get_group(self, r, c, board=None):
-        if board is None: board = self.grid
-        color = board[r][c]
-        if color == EMPTY: return set()
-        
-        group = set()
-        stack = [(r, c)]
-        while stack:
-            cur_r, cur_c = stack.pop()
-            if (cur_r, cur_c) in group: continue
-            group.add((cur_r, cur_c))
-            
-            for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nr, nc = cur_r + dr, cur_c + dc
-                if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                    if board[nr][nc] == color:
-                        stack.append((nr, nc))
-        return group
-
-    def count_liberties(self, group, board=None):
-        if board is None: board = self.grid
-        liberties = set()
-        for r, c in group:
-            for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                    if board[nr][nc] == EMPTY:
-                        liberties.add((nr, nc))
-        return len(liberties)
+    def string_at(self, r, c):
+        # The String the stone on (r, c) belongs to, None on an empty point
+        return self.strings[r][c]
 
     def is_valid_move(self, r, c, color):
+        # Decided from the neighbouring strings' liberties: the new stone keeps a liberty if
+        # it has an empty neighbour, joins a string with another liberty, or captures
         if self.grid[r][c] != EMPTY: return False
-        
-        # Simulate move
-        temp_board = [row[:] for row in self.grid]
-        temp_board[r][c] = color
-        
-        # Check Captures
-        opponent = W_STONE if color == B_STONE else B_STONE
-        captured_any = False
-        
-        for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                if temp_board[nr][nc] == opponent:
-                    grp = self.get_group(nr, nc, temp_board)
-                    if self.count_liberties(grp, temp_board) == 0:
-                        captured_any = True
-                        for gr, gc in grp: temp_board[gr][gc] = EMPTY
-        
-        # Check Suicide
-        my_grp = self.get_group(r, c, temp_board)
-        if self.count_liberties(my_grp, temp_board) == 0:
-            return False # Suicide is illegal (unless we handled capture above, but simplified here)
+        alive = False
+        captured = set()
+        for nr, nc in self.neighbors[r][c]:
+            string = self.strings[nr][nc]
+            if string is None: alive = True
+            elif string.color == color:
+                if len(string.liberties) > 1: alive = True
+            elif len(string.liberties) == 1: captured.add(string)
+        if not alive and not captured: return False # Suicide
 
-        # Check Ko (Board repetition)
-        if len(self.history) > 1 and temp_board == self.history[-2]:
-            return False
+        # Positional superko: the move may not bring back any earlier position. The hash
+        # after it is the current one with the new stone added and the captures taken off.
+        position = self.hash ^ self.zobrist[color][r][c]
+        for string in captured: position ^= string.hash
+        if position in self.seen: return False
 
         return True
 
     def place_stone(self, r, c):
         if not self.is_valid_move(r, c, self.turn): return False
         
-        self.grid[r][c] = self.turn
+        captured_count = self._add_stone(r, c, self.turn)
         opponent = W_STONE if self.turn == B_STONE else B_STONE
         
-        # Handle Captures
-        captured_count = 0
-        for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                if self.grid[nr][nc] == opponent:
-                    grp = self.get_group(nr, nc)
-                    if self.count_liberties(grp) == 0:
-                        for gr, gc in grp:
-                            self.grid[gr][gc] = EMPTY
-                            captured_count += 1
-        
         self.prisoners[self.turn] += captured_count
         self.last_move = (r, c)
         self.turn = opponent
         self.passed = False
-        self.save_state()
+        self.seen.add(self.hash)
         return True
 
+    def _add_stone(self, r, c, color):
+        # Put the stone down, join it to its friendly neighbours and take the point from the
+        # enemy strings around it, removing those left without liberties. Returns the
+        # number of stones captured.
+        grid, strings = self.grid, self.strings
+        key = self.zobrist[color][r][c]
+        string = String(color, {(r, c)}, set(), key)
+        self.hash ^= key
+        grid[r][c] = color
+        strings[r][c] = string
+        captured_count = 0
+        for nr, nc in self.neighbors[r][c]:
+            other = strings[nr][nc]
+            if other is None: string.liberties.add((nr, nc))
+            elif other.color == color:
+                if other is not string: string = self._merge(string, other)
+            else:
+                other.liberties.discard((r, c))
+                if not other.liberties: captured_count += self._remove(other)
+        string.liberties.discard((r, c))
+        return captured_count
+
+    def _merge(self, a, b):
+        # One string from two, the smaller one's stones moved into the larger
+        if len(a.stones) < len(b.stones): a, b = b, a
+        a.stones |= b.stones
+        a.liberties |= b.liberties
+        a.hash ^= b.hash
+        for sr, sc in b.stones: self.strings[sr][sc] = a
+        return a
+
+    def _remove(self, string):
+        # Take a captured string off the board; its points become liberties of the
+        # strings around it. Returns its size.
+        grid, strings = self.grid, self.strings
+        self.hash ^= string.hash
+        for sr, sc in string.stones:
+            grid[sr][sc] = EMPTY
+            strings[sr][sc] = None
+        for sr, sc in string.stones:
+            for nr, nc in self.neighbors[sr][sc]:
+                other = strings[nr][nc]
+                if other is not None: other.liberties.add((sr, sc))
+        return len(string.stones)
+
     def pass_turn(self):
         if self.passed: # Second consecutive pass
             self.game_over = True
@@ -185,8 +216,6 @@ class GoBoard:
         else:
             self.passed = True
             self.turn = W_STONE if self.turn == B_STONE else B_STONE
-            # Add current state again to history to keep Ko logic simple
-            self.history.append([row[:] for row in self.grid]) 
 
     def calculate_score(self):
         # Simplified Area Scoring + Prisoners
@@ -198,8 +227,8 @@ class GoBoard:
         
         visited = set()
         
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
+        for r in range(self.size):
+            for c in range(self.size):
                 if self.grid[r][c] == B_STONE:
                     b_area += 1
                 elif self.grid[r][c] == W_STONE:
@@ -217,12 +246,10 @@ class GoBoard:
                         visited.add((cur_r, cur_c))
                         region.append((cur_r, cur_c))
                         
-                        for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                            nr, nc = cur_r + dr, cur_c + dc
-                            if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                                if self.grid[nr][nc] == B_STONE: reaches_b = True
-                                elif self.grid[nr][nc] == W_STONE: reaches_w = True
-                                else: stack.append((nr, nc))
+                        for nr, nc in self.neighbors[cur_r][cur_c]:
+                            if self.grid[nr][nc] == B_STONE: reaches_b = True
+                            elif self.grid[nr][nc] == W_STONE: reaches_w = True
+                            else: stack.append((nr, nc))
                     
                     if reaches_b and not reaches_w: b_area += len(region)
                     if reaches_w and not reaches_b: w_area += len(region)
@@ -244,53 +271,39 @@ class AI:
     def get_move(self, board):
         # 1. Check for immediate captures (Atari)
         opponent = W_STONE if self.color == B_STONE else B_STONE
+        size = board.size
         
-        # Look for opponent groups with 1 liberty
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                if board.grid[r][c] == opponent:
-                    grp = board.get_group(r, c)
-                    if board.count_liberties(grp) == 1:
-                        # Find the killing move
-                        for lr, lc in board.grid: pass # dummy
-                        # Actual liberty finding
-                        for gr, gc in grp:
-                             for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                                nr, nc = gr + dr, gc + dc
-                                if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                                    if board.grid[nr][nc] == EMPTY:
-                                        if board.is_valid_move(nr, nc, self.color):
-                                            return (nr, nc)
+        # Look for opponent strings with 1 liberty: playing on it captures them
+        for r in range(size):
+            for c in range(size):
+                string = board.string_at(r, c)
+                if string and string.color == opponent and len(string.liberties) == 1:
+                    (nr, nc), = string.liberties
+                    if board.is_valid_move(nr, nc, self.color):
+                        return (nr, nc)
 
         # 2. Check for self Atari (Save own stones)
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                if board.grid[r][c] == self.color:
-                    grp = board.get_group(r, c)
-                    if board.count_liberties(grp) == 1:
-                        # Try to extend
-                        for gr, gc in grp:
-                             for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                                nr, nc = gr + dr, gc + dc
-                                if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                                    if board.grid[nr][nc] == EMPTY:
-                                        if board.is_valid_move(nr, nc, self.color):
-                                            return (nr, nc)
+        for r in range(size):
+            for c in range(size):
+                string = board.string_at(r, c)
+                if string and string.color == self.color and len(string.liberties) == 1:
+                    # Try to extend
+                    (nr, nc), = string.liberties
+                    if board.is_valid_move(nr, nc, self.color):
+                        return (nr, nc)
 
         # 3. Play near existing stones (shape) or center
         valid_moves = []
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
+        for r in range(size):
+            for c in range(size):
                 if board.is_valid_move(r, c, self.color):
                     weight = 1
                     # Prefer moves near other stones
-                    for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                         nr, nc = r + dr, c + dc
-                         if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
-                             if board.grid[nr][nc] != EMPTY: weight += 2
+                    for nr, nc in board.neighbors[r][c]:
+                        if board.grid[nr][nc] != EMPTY: weight += 2
                     
                     # Avoid edges early game
-                    if r == 0 or r == GRID_SIZE-1 or c == 0 or c == GRID_SIZE-1:
+                    if r == 0 or r == size-1 or c == 0 or c == size-1:
                         weight -= 0.5
                     
                     valid_moves.append((weight, r, c))